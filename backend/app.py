@@ -1,187 +1,617 @@
 # backend/app.py
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
-from scrapers import indeed, linkedin, glassdoor
+from scrapers.orchestrator import stream_scrapers, DEFAULT_MAX_PAGES, MAX_PAGES_LIMIT
+from scrapers.sources import SPECS
 import json
-from database.db import initialize_db, get_db
+import os
+import threading
+import time
+from database.db import (
+    initialize_db, connection, get_db, close_db, upsert_jobs, job_key, jobs_by_keys, query_jobs, search_jobs, jobs_by_ids, get_job, iter_jobs, market_stats,
+    save_search, list_saved_searches, delete_saved_search, fresh_search, schedule_search,
+    link_search_jobs, saved_search_jobs, job_analytics, create_run, link_run_jobs
+)
 from services.gemini_service import GeminiService
+from services.cache import MemoryCache
+from services.tasks import TaskQueue, QueueFull, LLM_MAX_CONCURRENCY
+from services.embeddings import JobIndex
+from services.crawler import Crawler, CRAWL_DEFAULT_INTERVAL, CRAWL_MIN_INTERVAL
+from services.enricher import Enricher
+from services.extractor import SENIORITY_LEVELS
+from services import logs, metrics
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Streamlit frontend
+app.teardown_appcontext(close_db)
+
+# Sources scraped when the client doesn't pick any
+DEFAULT_SOURCES = list(SPECS)
+
+# Most jobs a warm (already crawled) search returns
+WARM_RESULT_LIMIT = 500
+
+# Jobs upserted per transaction while a scrape streams in
+COMMIT_EVERY = 20
+
+# Page size for /api/jobs when the client doesn't ask, and the most it may ask for
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Seconds a streaming scrape waits for more jobs before sending what it has
+STREAM_FLUSH_INTERVAL = 0.5
+
+# Seconds a streaming LLM request waits for a free Gemini slot before giving up
+LLM_SLOT_TIMEOUT = 30
+
+# Most jobs one /api/analyze/batch request may name
+MAX_BATCH_JOBS = 500
+
+# Seconds an /api/analytics answer is reused for the same filters, and the most entries per distribution
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "30"))
+ANALYTICS_DEFAULT_TOP = 10
+ANALYTICS_MAX_TOP = 50
+
+# Candidates picked from the embedding index and handed to Gemini for explanations
+RECOMMEND_CANDIDATES = 20
+
+# Send a Server-Timing header (fetch, parse, db, gemini, total) on every response; with it unset
+# a client can still ask for one per request with ?timing=1
+SERVER_TIMING = os.getenv("SERVER_TIMING") == "1"
+
+log = logs.get_logger(__name__)
+
+REQUEST_SECONDS = metrics.histogram(
+    'http_request_seconds', 'Time to answer an API request, to the first byte when streaming',
+    ('endpoint', 'method', 'status')
+)
+DB_SECONDS = metrics.histogram('db_write_seconds', 'Time spent storing a scrape in SQLite, per step', ('operation',))
+JOBS_WRITTEN = metrics.counter('db_jobs_written_total', 'Scraped jobs upserted, by what happened to the row', ('result',))
 
 # Initialize database
 initialize_db()
 
+def _load_index(index):
+    with connection() as conn:
+        # Jobs stored while this runs are added by _on_stored and are newer than what it reads
+        index.add_many(iter_jobs(conn), replace=False)
+
+# Similarity index over every stored job, kept current as scrapes land; filled in the
+# background so startup doesn't wait on embedding the whole table
+job_index = JobIndex()
+job_index.load_in_background(_load_index)
+
 # Initialize Gemini service
 gemini_service = GeminiService()
 
+# Aggregates behind the Analytics tab, recomputed at most every ANALYTICS_CACHE_TTL seconds per filter set
+analytics_cache = MemoryCache(ttl=ANALYTICS_CACHE_TTL)
+
+# Worker pool for Gemini calls, capped so bursts queue instead of piling onto the API
+# Both the task pool and the streaming endpoints draw from the same slots
+llm_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+task_queue = TaskQueue(slots=llm_slots)
+
+# Descriptions for boards whose result cards have none, fetched from detail pages after each store
+enricher = Enricher(on_enriched=job_index.add_many)
+
+def _on_stored(jobs):
+    job_index.add_many(jobs)
+    enricher.submit(jobs)
+
+@app.before_request
+def _start_timing():
+    g.started = time.perf_counter()
+    g.timings = metrics.begin_request(SERVER_TIMING or _flag('timing'))
+
+@app.after_request
+def _finish_timing(response):
+    elapsed = time.perf_counter() - g.started
+    REQUEST_SECONDS.observe(
+        elapsed, endpoint=request.endpoint or 'unmatched', method=request.method, status=response.status_code
+    )
+    # A streamed body is still being produced when the headers go out, so it gets no breakdown
+    if g.timings is not None and not response.is_streamed:
+        response.headers['Server-Timing'] = g.timings.header(total=elapsed)
+    return response
+
+def _db_timer(operation):
+    return metrics.timer(DB_SECONDS, 'db', operation=operation)
+
+def _start_background():
+    crawler.start()
+    # Picks up jobs stored before a restart that never got their description, then retries failures
+    enricher.start()
+
+# Background re-crawls of saved searches; set CRAWLER_AUTOSTART=1 when served by a WSGI server
+crawler = Crawler(on_stored=_on_stored)
+if os.getenv("CRAWLER_AUTOSTART") == "1":
+    _start_background()
+
 @app.route('/api/scrape', methods=['POST'])
 def scrape_jobs():
-    data = request.json
+    try:
+        data = _scrape_request(request.json)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    db = get_db()
+    # The run's jobs stay pageable through /api/jobs?run_id=
+    with _db_timer('create_run'):
+        run_id = create_run(db, time.time())
+    
+    # A recent background crawl of the same search is answered from the database
+    search = _fresh_search(db, data)
+    if search is not None:
+        result = saved_search_jobs(db, search['id'], WARM_RESULT_LIMIT)
+        with _db_timer('link_run'):
+            link_run_jobs(db, run_id, [job['id'] for job in result])
+        return jsonify({
+            "jobs": result, "count": len(result), "warm": True, "crawled_at": search['last_crawled_at'], "run_id": run_id
+        })
+    
+    source_status = {}
+    ingest = {'inserted': 0, 'updated': 0, 'skipped': 0}
+    
+    # Only the postings this run found, with their IDs
+    result = []
+    for batch in _ingest(data, source_status, ingest):
+        result.extend(batch)
+    result.sort(key=lambda job: (job['date_posted'] or '', job['id']), reverse=True)
+    
+    with _db_timer('link_run'):
+        link_run_jobs(db, run_id, [job['id'] for job in result])
+    if data.get('save'):
+        with _db_timer('save_search'):
+            _save_run(db, data, [job['id'] for job in result])
+    
+    return jsonify({
+        "jobs": result, "count": len(result), "sources": source_status, "ingest": ingest, "warm": False, "run_id": run_id
+    })
+
+@app.route('/api/scrape/stream', methods=['POST'])
+def scrape_jobs_stream():
+    """Scrape like /api/scrape, streaming each stored batch as an NDJSON line
+
+    With "include_jobs": false in the body, batches only report their size;
+    clients then page through the run with /api/jobs?run_id=.
+    """
+    try:
+        data = _scrape_request(request.json)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    include_jobs = data.get('include_jobs', True)
+    
+    def events():
+        db = get_db()
+        with _db_timer('create_run'):
+            run_id = create_run(db, time.time())
+        search = _fresh_search(db, data)
+        if search is not None:
+            result = saved_search_jobs(db, search['id'], WARM_RESULT_LIMIT)
+            with _db_timer('link_run'):
+                link_run_jobs(db, run_id, [job['id'] for job in result])
+            yield {"type": "jobs", "jobs": result if include_jobs else [], "count": len(result), "sources": {}}
+            yield {
+                "type": "done", "count": len(result), "warm": True, "crawled_at": search['last_crawled_at'], "run_id": run_id
+            }
+            return
+        
+        source_status = {}
+        ingest = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        job_ids = []
+        for batch in _ingest(data, source_status, ingest, heartbeat=STREAM_FLUSH_INTERVAL):
+            if batch:
+                job_ids.extend(job['id'] for job in batch)
+                with _db_timer('link_run'):
+                    link_run_jobs(db, run_id, [job['id'] for job in batch])
+                yield {
+                    "type": "jobs", "jobs": batch if include_jobs else [], "count": len(batch), "sources": source_status
+                }
+        if data.get('save'):
+            with _db_timer('save_search'):
+                _save_run(db, data, job_ids)
+        yield {
+            "type": "done", "count": len(job_ids), "sources": source_status, "ingest": ingest, "warm": False, "run_id": run_id
+        }
+    
+    return _ndjson(events())
+
+def _scrape_request(data):
+    # Checked before anything is stored, so a bad request leaves no run behind.
+    # Returns a copy with sources, max_pages and interval_seconds filled in and normalized.
+    data = dict(data or {})
+    sources = data.get('sources', DEFAULT_SOURCES)
+    if not isinstance(sources, list) or not all(isinstance(source, str) for source in sources):
+        raise ValueError("sources must be a list of source names")
+    unknown = [source for source in sources if source not in SPECS]
+    if unknown:
+        raise ValueError(f"Unknown sources: {', '.join(unknown)}")
+    try:
+        max_pages = int(data.get('max_pages', DEFAULT_MAX_PAGES))
+    except (TypeError, ValueError):
+        raise ValueError("max_pages must be an integer")
+    try:
+        interval = int(data.get('interval_seconds', CRAWL_DEFAULT_INTERVAL))
+    except (TypeError, ValueError):
+        raise ValueError("interval_seconds must be an integer")
+    if interval < CRAWL_MIN_INTERVAL:
+        raise ValueError(f"interval_seconds must be at least {CRAWL_MIN_INTERVAL}")
+    data['sources'] = sources
+    data['max_pages'] = max(1, min(max_pages, MAX_PAGES_LIMIT))
+    data['interval_seconds'] = interval
+    return data
+
+def _fresh_search(db, data):
+    if data.get('refresh'):
+        return None
+    return fresh_search(
+        db, data.get('job_title', ''), data.get('location', ''), data['sources'], time.time()
+    )
+
+def _save_run(db, data, job_ids):
+    # Register the search for background re-crawls, counting this run as its first crawl
+    now = time.time()
+    interval = data['interval_seconds']
+    search_id = save_search(
+        db, data.get('job_title', ''), data.get('location', ''), data['sources'], interval, now
+    )
+    link_search_jobs(db, search_id, job_ids)
+    schedule_search(db, search_id, now + interval, crawled_at=now)
+
+def _ingest(data, source_status, ingest, heartbeat=None):
+    # Fan the selected sources out concurrently and upsert rows as the pages stream in;
+    # slow boards time out individually. Yields each stored batch with its IDs.
     job_title = data.get('job_title', '')
     location = data.get('location', '')
-    sources = data.get('sources', ['indeed', 'linkedin', 'glassdoor'])
+    sources = data['sources']
+    max_pages = data['max_pages']
     
-    results = []
+    db = get_db()
+    seen = set()
+    batch = []
+    jobs = stream_scrapers(job_title, location, sources, source_status, max_pages=max_pages, heartbeat=heartbeat)
+    for job in jobs:
+        # None is the orchestrator's heartbeat: flush whatever has arrived so far
+        if job is not None:
+            batch.append(job)
+            if len(batch) < COMMIT_EVERY:
+                continue
+        if batch:
+            yield _store_batch(db, batch, seen, ingest)
+            batch = []
+    if batch:
+        yield _store_batch(db, batch, seen, ingest)
+
+def _store_batch(db, batch, seen, ingest):
+    with _db_timer('upsert'):
+        counts = upsert_jobs(db, batch)
+    for key, value in counts.items():
+        ingest[key] += value
+        JOBS_WRITTEN.inc(value, result=key)
+    
+    # A posting listed on two result pages is only reported once per run
+    keys = set(map(job_key, batch)) - seen
+    seen.update(keys)
+    with _db_timer('reload'):
+        stored = jobs_by_keys(db, keys)
+    _on_stored(stored)
+    return stored
+
+def _ndjson(events):
+    # One JSON document per line, flushed as each event is produced
+    lines = (json.dumps(event) + "\n" for event in events)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+def _job_id(value):
+    # Job IDs arrive as JSON numbers or numeric strings; bools are JSON true/false, not IDs
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Invalid job ID: {value!r}")
+    return int(value)
+
+def _find_job(value):
+    """The stored job `value` names, or None; raises ValueError when it is not a job ID"""
+    return get_job(get_db(), _job_id(value))
+
+def _flag(name):
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    """One page of stored jobs, newest first, with optional filters"""
+    try:
+        limit = max(1, min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
     
-    if 'indeed' in sources:
-        indeed_jobs = indeed.scrape(job_title, location)
-        results.extend(indeed_jobs)
+    try:
+        min_salary = int(request.args['min_salary']) if request.args.get('min_salary') else None
+        run_id = int(request.args['run_id']) if request.args.get('run_id') else None
+    except ValueError:
+        return jsonify({"error": "min_salary and run_id must be integers"}), 400
     
-    if 'linkedin' in sources:
-        linkedin_jobs = linkedin.scrape(job_title, location)
-        results.extend(linkedin_jobs)
+    seniority = request.args.get('seniority')
+    if seniority and seniority not in SENIORITY_LEVELS:
+        return jsonify({"error": f"seniority must be one of {', '.join(SENIORITY_LEVELS)}"}), 400
     
-    if 'glassdoor' in sources:
-        glassdoor_jobs = glassdoor.scrape(job_title, location)
-        results.extend(glassdoor_jobs)
+    source = request.args.get('source')
+    if source in SPECS:
+        # Accept the API source names as well as the stored labels
+        source = SPECS[source].label
     
-    # Save to database
     db = get_db()
-    for job in results:
-        db.execute(
-            'INSERT INTO jobs (title, company, location, description, url, source, date_posted) VALUES (?, ?, ?, ?, ?, ?, ?)',
-            (job['title'], job['company'], job['location'], job['description'], job['url'], job['source'], job['date_posted'])
+    try:
+        jobs, next_cursor = query_jobs(
+            db,
+            limit,
+            cursor=request.args.get('cursor'),
+            source=source,
+            company=request.args.get('company'),
+            location=request.args.get('location'),
+            date_from=request.args.get('date_from'),
+            date_to=request.args.get('date_to'),
+            collapse=_flag('collapse_duplicates'),
+            skill=request.args.get('skill'),
+            seniority=seniority,
+            min_salary=min_salary,
+            run_id=run_id
         )
-    db.commit()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Fetch jobs with IDs
-    jobs_with_ids = db.execute('SELECT * FROM jobs ORDER BY date_posted DESC').fetchall()
+    return jsonify({"jobs": jobs, "count": len(jobs), "next_cursor": next_cursor})
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Full-text search over job titles and descriptions, best match first"""
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({"error": "q is required"}), 400
     
-    # Convert to list of dictionaries
-    result = []
-    for job in jobs_with_ids:
-        result.append({
-            'id': job['id'],
-            'title': job['title'],
-            'company': job['company'],
-            'location': job['location'],
-            'description': job['description'],
-            'url': job['url'],
-            'source': job['source'],
-            'date_posted': job['date_posted']
-        })
+    try:
+        limit = max(1, min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    
+    source = request.args.get('source')
+    if source in SPECS:
+        source = SPECS[source].label
     
-    return jsonify({"jobs": result, "count": len(result)})
-
-@app.route('/api/jobs', methods=['GET'])
-def get_jobs():
     db = get_db()
-    jobs = db.execute('SELECT * FROM jobs ORDER BY date_posted DESC').fetchall()
+    jobs, next_offset = search_jobs(db, text, limit, offset=offset, source=source, collapse=_flag('collapse_duplicates'))
     
-    # Convert to list of dictionaries
-    result = []
-    for job in jobs:
-        result.append({
-            'id': job['id'],
-            'title': job['title'],
-            'company': job['company'],
-            'location': job['location'],
-            'description': job['description'],
-            'url': job['url'],
-            'source': job['source'],
-            'date_posted': job['date_posted']
-        })
+    return jsonify({"jobs": jobs, "count": len(jobs), "next_offset": next_offset})
+
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics():
+    """Job counts per source, location, company, skill, seniority and day, for the charts"""
+    try:
+        top = max(1, min(int(request.args.get('top', ANALYTICS_DEFAULT_TOP)), ANALYTICS_MAX_TOP))
+    except ValueError:
+        return jsonify({"error": "top must be an integer"}), 400
+    
+    source = request.args.get('source')
+    if source in SPECS:
+        source = SPECS[source].label
+    filters = {
+        'text': request.args.get('q', '').strip() or None,
+        'source': source,
+        'date_from': request.args.get('date_from'),
+        'date_to': request.args.get('date_to'),
+        'collapse': _flag('collapse_duplicates'),
+    }
     
-    return jsonify({"jobs": result, "count": len(result)})
+    key = json.dumps([top, filters], sort_keys=True)
+    try:
+        analytics = analytics_cache.get_or_compute(key, lambda: job_analytics(get_db(), top, **filters))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(analytics)
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_job():
-    """Analyze a job description using Gemini"""
-    data = request.json
-    job_id = data.get('job_id')
-    
-    db = get_db()
-    job = db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
-    
+    """Queue an analysis of a job description using Gemini"""
+    try:
+        job = _find_job(request.json.get('job_id'))
+    except ValueError:
+        return jsonify({"error": "job_id must be an integer"}), 400
     if not job:
         return jsonify({"error": "Job not found"}), 404
     
-    # Get analysis from Gemini
-    analysis = gemini_service.analyze_job_description(job['description'])
-    
-    return jsonify({
+    job_id = job['id']
+    description = job['description']
+    return _queue_task('analyze', lambda: {
         "job_id": job_id,
-        "analysis": analysis
+        "analysis": gemini_service.analyze_job_description(description)
     })
 
-@app.route('/api/summarize', methods=['POST'])
-def summarize_job():
-    """Get a concise summary of a job"""
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_jobs_batch():
+    """Queue analyses of many jobs, packed into as few Gemini calls as possible"""
     data = request.json
-    job_id = data.get('job_id')
+    job_ids = data.get('job_ids', [])
     
-    db = get_db()
-    job = db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    if not isinstance(job_ids, list) or not job_ids:
+        return jsonify({"error": "job_ids must be a non-empty list"}), 400
+    if len(job_ids) > MAX_BATCH_JOBS:
+        return jsonify({"error": f"At most {MAX_BATCH_JOBS} jobs per batch"}), 400
+    try:
+        job_ids = [_job_id(job_id) for job_id in job_ids]
+    except ValueError:
+        return jsonify({"error": "job_ids must be integers"}), 400
+    
+    jobs = jobs_by_ids(get_db(), job_ids)
+    found_ids = [job['id'] for job in jobs]
+    descriptions = [job['description'] for job in jobs]
+    missing = sorted(set(job_ids) - set(found_ids))
+    
+    def run():
+        analyses = gemini_service.analyze_jobs_batch(descriptions)
+        return {
+            "analyses": [{"job_id": job_id, **analysis} for job_id, analysis in zip(found_ids, analyses)],
+            "missing": missing
+        }
     
+    return _queue_task('analyze_batch', run)
+
+@app.route('/api/summarize', methods=['POST'])
+def summarize_job():
+    """Queue a concise summary of a job"""
+    try:
+        job = _find_job(request.json.get('job_id'))
+    except ValueError:
+        return jsonify({"error": "job_id must be an integer"}), 400
     if not job:
         return jsonify({"error": "Job not found"}), 404
     
-    # Get summary from Gemini
-    summary = gemini_service.summarize_job(job['description'])
-    
-    return jsonify({
+    job_id = job['id']
+    description = job['description']
+    return _queue_task('summarize', lambda: {
         "job_id": job_id,
-        "summary": summary
+        "summary": gemini_service.summarize_job(description)
     })
 
 @app.route('/api/insights', methods=['GET'])
 def get_market_insights():
-    """Generate market insights from all jobs"""
+    """Queue market insights generated from the aggregate job counts"""
     db = get_db()
-    jobs = db.execute('SELECT * FROM jobs ORDER BY date_posted DESC').fetchall()
+    stats = market_stats(db)
     
-    # Convert to list of dictionaries
-    job_list = []
-    for job in jobs:
-        job_list.append({
-            'id': job['id'],
-            'title': job['title'],
-            'company': job['company'],
-            'location': job['location'],
-            'description': job['description'],
-            'url': job['url'],
-            'source': job['source'],
-            'date_posted': job['date_posted']
-        })
+    return _queue_task('insights', lambda: {
+        "insights": gemini_service.generate_job_market_insights(stats)
+    })
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_job_stream():
+    """Stream an analysis of a job description as NDJSON chunks"""
+    try:
+        job = _find_job(request.json.get('job_id'))
+    except ValueError:
+        return jsonify({"error": "job_id must be an integer"}), 400
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    
+    description = job['description']
+    return _stream_llm(lambda: gemini_service.stream_analyze_job_description(description))
+
+@app.route('/api/summarize/stream', methods=['POST'])
+def summarize_job_stream():
+    """Stream a concise summary of a job as NDJSON chunks"""
+    try:
+        job = _find_job(request.json.get('job_id'))
+    except ValueError:
+        return jsonify({"error": "job_id must be an integer"}), 400
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
     
-    # Get insights from Gemini
-    insights = gemini_service.generate_job_market_insights(job_list)
+    description = job['description']
+    return _stream_llm(lambda: gemini_service.stream_summarize_job(description))
+
+@app.route('/api/insights/stream', methods=['GET'])
+def get_market_insights_stream():
+    """Stream market insights as NDJSON chunks"""
+    stats = market_stats(get_db())
+    return _stream_llm(lambda: gemini_service.stream_job_market_insights(stats))
+
+def _stream_llm(make_chunks):
+    # The slot is taken inside the generator so it is only held while a client is reading
+    def events():
+        if not llm_slots.acquire(timeout=LLM_SLOT_TIMEOUT):
+            yield {"type": "error", "error": "Too many concurrent AI requests"}
+            return
+        try:
+            for text in make_chunks():
+                yield {"type": "chunk", "text": text}
+            yield {"type": "done"}
+        except Exception as e:
+            log.error('llm_stream_failed', error=str(e))
+            yield {"type": "error", "error": str(e)}
+        finally:
+            llm_slots.release()
     
-    return jsonify({
-        "insights": insights
-    })
+    return _ndjson(events())
 
 @app.route('/api/recommend', methods=['POST'])
 def recommend_jobs():
-    """Recommend jobs based on user profile"""
+    """Queue job recommendations based on user profile"""
     data = request.json
     skills = data.get('skills', '')
     experience = data.get('experience', '')
     
+    # Rank every stored job locally and only send the closest matches to Gemini,
+    # over-fetching so the same posting from several boards takes a single slot
+    matches = job_index.search(f"{skills} {experience}", k=RECOMMEND_CANDIDATES * 3)
     db = get_db()
-    jobs = db.execute('SELECT * FROM jobs ORDER BY date_posted DESC').fetchall()
-    
-    # Convert to list of dictionaries
     job_list = []
-    for job in jobs:
-        job_list.append({
-            'id': job['id'],
-            'title': job['title'],
-            'company': job['company'],
-            'location': job['location'],
-            'description': job['description'],
-            'url': job['url'],
-            'source': job['source'],
-            'date_posted': job['date_posted']
-        })
+    clusters = set()
+    for job in jobs_by_ids(db, [job_id for job_id, _ in matches]):
+        if job['canonical_id'] not in clusters and len(job_list) < RECOMMEND_CANDIDATES:
+            clusters.add(job['canonical_id'])
+            job_list.append(job)
+    kept = {job['id'] for job in job_list}
+    matches = [(job_id, score) for job_id, score in matches if job_id in kept]
+    if not job_list:
+        # Nothing in the profile matched any stored term; fall back to the newest jobs
+        job_list, _ = query_jobs(db, RECOMMEND_CANDIDATES, collapse=True)
     
-    # Get recommendations from Gemini
-    recommendations = gemini_service.get_job_recommendations(skills, experience, job_list)
-    
-    return jsonify({
-        "recommendations": recommendations
+    return _queue_task('recommend', lambda: {
+        "recommendations": gemini_service.get_job_recommendations(skills, experience, job_list),
+        "candidates": [{"job_id": job_id, "similarity": round(score, 4)} for job_id, score in matches]
     })
 
+@app.route('/api/saved-searches', methods=['GET'])
+def get_saved_searches():
+    """Searches the background crawler keeps warm"""
+    return jsonify({"saved_searches": list_saved_searches(get_db())})
+
+@app.route('/api/saved-searches', methods=['POST'])
+def create_saved_search():
+    """Register a search for background re-crawls; it is crawled on the next scheduler pass"""
+    try:
+        data = _scrape_request(request.json)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job_title = data.get('job_title', '')
+    if not job_title:
+        return jsonify({"error": "job_title is required"}), 400
+    
+    search_id = save_search(
+        get_db(), job_title, data.get('location', ''), data['sources'], data['interval_seconds'], time.time()
+    )
+    return jsonify({"id": search_id}), 201
+
+@app.route('/api/saved-searches/<int:search_id>', methods=['DELETE'])
+def remove_saved_search(search_id):
+    if not delete_saved_search(get_db(), search_id):
+        return jsonify({"error": "Saved search not found"}), 404
+    return jsonify({"deleted": search_id})
+
+@app.route('/api/tasks/<task_id>', methods=['GET'])
+def get_task(task_id):
+    """Status of a queued LLM task, with its result once done"""
+    task = task_queue.get(task_id)
+    if task is None:
+        return jsonify({"error": "Task not found"}), 404
+    
+    return jsonify(task)
+
+def _queue_task(kind, fn):
+    # Gemini calls run on the task pool; the client polls /api/tasks/<id> for the answer
+    try:
+        task_id = task_queue.submit(kind, fn)
+    except QueueFull as e:
+        return jsonify({"error": f"Too many pending tasks: {e}"}), 503, {"Retry-After": "5"}
+    
+    return jsonify({"task_id": task_id, "status": "queued"}), 202, {"Location": f"/api/tasks/{task_id}"}
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Scrape, database, Gemini and request metrics in the Prometheus text format"""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 if __name__ == '__main__':
+    # The debug reloader runs this file twice; only the serving child should crawl
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        _start_background()
     app.run(debug=True, port=5000)
\ No newline at end of file
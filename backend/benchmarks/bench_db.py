@@ -0,0 +1,191 @@
+# Measure the job store on synthetic postings: storage before and after the
+# normalized schema, listing latency while a writer is busy, and analytics
+# with and without filters.
+#
+# Run from the backend directory:
+#     python -m benchmarks.bench_db
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from database import db, migrations
+
+# Rows for the storage comparison, and rows stored through upsert_jobs for the query timings
+STORAGE_ROWS = 200_000
+QUERY_ROWS = 60_000
+
+# Rows per upsert_jobs call, as a scrape stores them
+BATCH_SIZE = 500
+
+# Seconds listing pages are timed while the writer runs, and jobs per page
+WRITE_SECONDS = 10
+PAGE_SIZE = 50
+
+ROUNDS = 20
+
+SOURCES = ('Indeed', 'LinkedIn', 'Glassdoor')
+LEVELS = ('', 'Junior ', 'Senior ', 'Lead ', 'Principal ')
+ROLES = ('Python Developer', 'Backend Engineer', 'Data Engineer', 'Data Scientist', 'DevOps Engineer',
+         'Frontend Developer', 'Machine Learning Engineer', 'Software Engineer', 'QA Engineer', 'Product Analyst')
+SKILLS = ('Python', 'Django', 'Flask', 'SQL', 'PostgreSQL', 'AWS', 'Docker', 'Kubernetes', 'React',
+          'TypeScript', 'Spark', 'Airflow', 'Terraform', 'Go', 'Java', 'Kafka', 'Redis', 'Pandas')
+CITIES = [f"{city}, {region}" for city in ('Berlin', 'London', 'Austin', 'Toronto', 'Lisbon', 'Warsaw', 'Denver',
+                                           'Madrid', 'Dublin', 'Seattle', 'Paris', 'Remote')
+          for region in ('North', 'South', 'East', 'West', 'Central')]
+SENTENCES = (
+    "{company} is hiring a {title} to join our {team} team.",
+    "You will design, build and operate services used by {users} customers every day.",
+    "We are looking for {years}+ years of experience with {skill} and {skill2}.",
+    "Experience with {skill} in production is a strong plus.",
+    "You will work closely with product managers, designers and other engineers.",
+    "Our stack includes {skill}, {skill2} and {skill3}, deployed on the cloud.",
+    "We offer a salary of ${low},000 - ${high},000 per year plus equity.",
+    "The role is {mode}, with occasional travel to our {city} office.",
+    "You care about code quality, testing and clear documentation.",
+    "Benefits include health insurance, {days} days of paid leave and a learning budget.",
+    "You will mentor other engineers and take part in code reviews.",
+    "Knowledge of {skill} or a similar technology is required.",
+    "We value ownership, curiosity and honest feedback.",
+    "You will help us scale our platform from {users} to ten times as many customers.",
+)
+
+def synthetic_jobs(count, seed=0, day='2024-01-01'):
+    """`count` postings with repeating companies, cities and phrasing, as real boards have"""
+    rng = random.Random(seed)
+    companies = [f"Company {i}" for i in range(count // 20 + 1)]
+    for i in range(count):
+        company = rng.choice(companies)
+        city = rng.choice(CITIES)
+        title = rng.choice(LEVELS) + rng.choice(ROLES)
+        skill, skill2, skill3 = rng.sample(SKILLS, 3)
+        low = rng.randrange(60, 160)
+        sentences = rng.sample(SENTENCES, rng.randrange(5, 10))
+        description = " ".join(sentence.format(
+            company=company, title=title, team=rng.choice(('platform', 'data', 'payments', 'growth')),
+            users=f"{rng.randrange(1, 900)},000", years=rng.randrange(1, 9), skill=skill, skill2=skill2,
+            skill3=skill3, low=low, high=low + rng.randrange(10, 60), mode=rng.choice(('remote', 'hybrid', 'on-site')),
+            city=city.split(',')[0], days=rng.randrange(20, 35)
+        ) for sentence in sentences)
+        source = SOURCES[i % len(SOURCES)]
+        yield {
+            'title': title, 'company': company, 'location': city, 'source': source, 'description': description,
+            'url': f"https://{source.lower()}.example.com/jobs/{seed}-{i}",
+            'date_posted': time.strftime('%Y-%m-%d', time.gmtime(db.day_to_epoch(day) - (i % 90) * 86400)),
+        }
+
+def table_bytes(conn, tables):
+    """Bytes of the pages holding `tables` and their indexes"""
+    placeholders = ','.join('?' * len(tables))
+    names = [row[0] for row in conn.execute(
+        f"SELECT name FROM sqlite_master WHERE tbl_name IN ({placeholders}) AND type IN ('table', 'index')", tables
+    )]
+    placeholders = ','.join('?' * len(names))
+    return conn.execute(f"SELECT SUM(pgsize) FROM dbstat WHERE name IN ({placeholders})", names).fetchone()[0]
+
+def measure_storage(directory):
+    conn = db.connect(os.path.join(directory, 'storage.db'))
+    try:
+        migrations.migrate(conn, target=1)
+        with conn:
+            conn.executemany(
+                '''
+                INSERT INTO jobs (title, company, location, description, url, source, date_posted, url_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''',
+                [
+                    (job['title'], job['company'], job['location'], job['description'], job['url'], job['source'],
+                     job['date_posted'], db.job_key(job))
+                    for job in synthetic_jobs(STORAGE_ROWS)
+                ]
+            )
+        before = table_bytes(conn, ['jobs'])
+        started = time.perf_counter()
+        migrations.migrate(conn, target=2)
+        elapsed = time.perf_counter() - started
+        after = table_bytes(conn, ['jobs', 'companies', 'locations', 'sources'])
+    finally:
+        conn.close()
+    print(f"storage, {STORAGE_ROWS} rows (jobs and its indexes, plus the dimension tables after; FTS excluded)")
+    print(f"  text columns           {before / 1e6:7.1f} MB")
+    print(f"  normalized, compressed {after / 1e6:7.1f} MB  ({after / before:.0%}, migrated in {elapsed:.1f}s)")
+
+def fill(path):
+    conn = db.connect(path)
+    try:
+        migrations.migrate(conn)
+        jobs = list(synthetic_jobs(QUERY_ROWS))
+        started = time.perf_counter()
+        for i in range(0, len(jobs), BATCH_SIZE):
+            db.upsert_jobs(conn, jobs[i:i + BATCH_SIZE])
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+    print(f"upsert_jobs, {QUERY_ROWS} new rows in batches of {BATCH_SIZE}: {elapsed:.1f}s "
+          f"({elapsed / QUERY_ROWS * 1e6:.0f} us per job)")
+
+def best_of(fn):
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def measure_analytics(path):
+    print(f"job_analytics, {QUERY_ROWS} jobs, best of {ROUNDS}")
+    with db.connection(path) as conn:
+        for label, filters in (
+            ("no filter (job_stats)", {}),
+            ("source", {'source': 'LinkedIn'}),
+            ("source + date range", {'source': 'LinkedIn', 'date_from': '2023-11-01', 'date_to': '2023-12-15'}),
+            ("full-text", {'text': 'kubernetes'}),
+        ):
+            elapsed = best_of(lambda: db.job_analytics(conn, **filters))
+            print(f"  {label:<22} {elapsed * 1000:8.2f} ms")
+
+def measure_reads_under_write(path):
+    stop = threading.Event()
+    written = []
+
+    def writer():
+        seed = 1
+        with db.connection(path) as conn:
+            while not stop.is_set():
+                batch = list(synthetic_jobs(BATCH_SIZE, seed=seed))
+                db.upsert_jobs(conn, batch)
+                written.append(len(batch))
+                seed += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    timings = []
+    try:
+        deadline = time.perf_counter() + WRITE_SECONDS
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            with db.connection(path) as conn:
+                db.query_jobs(conn, PAGE_SIZE)
+            timings.append(time.perf_counter() - started)
+    finally:
+        stop.set()
+        thread.join()
+    timings.sort()
+    p50 = statistics.median(timings)
+    p95 = timings[int(len(timings) * 0.95)]
+    print(f"query_jobs ({PAGE_SIZE} per page) while a writer upserts {BATCH_SIZE}-row batches, {WRITE_SECONDS}s")
+    print(f"  {len(timings)} reads, p50 {p50 * 1000:.2f} ms, p95 {p95 * 1000:.2f} ms; "
+          f"{sum(written)} jobs written in {len(written)} batches")
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        measure_storage(directory)
+        path = os.path.join(directory, 'jobs.db')
+        fill(path)
+        measure_analytics(path)
+        measure_reads_under_write(path)
+
+if __name__ == '__main__':
+    main()
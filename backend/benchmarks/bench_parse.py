@@ -0,0 +1,103 @@
+# Compare card-extraction throughput across HTML parser backends on saved result pages.
+#
+# Run from the backend directory:
+#     python -m benchmarks.bench_parse
+import time
+
+from bs4 import BeautifulSoup
+
+from scrapers import engine, parsing
+from scrapers.sources import SPECS
+from benchmarks.stub_server import load_fixture
+
+ROUNDS = 20
+DATE = "2024-01-01"
+
+def _text(elem):
+    return elem.get_text().strip() if elem else "N/A"
+
+# The card and field lookups of the hand-written scrapers the engine replaced, kept verbatim
+# (plain tag/class strings on a full html.parser tree) so the check doesn't reuse engine code
+def _indeed_card(card):
+    url_elem = card.find('a', class_='jcs-JobTitle')
+    relative_url = url_elem['href'] if url_elem else ""
+    return {
+        'title': _text(card.find('h2', class_='jobTitle')),
+        'company': _text(card.find('span', class_='companyName')),
+        'location': _text(card.find('div', class_='companyLocation')),
+        'description': _text(card.find('div', class_='job-snippet')),
+        'url': f"https://www.indeed.com{relative_url}" if relative_url else "N/A",
+        'source': 'Indeed',
+    }
+
+def _linkedin_card(card):
+    url_elem = card.find('a', class_='base-card__full-link')
+    return {
+        'title': _text(card.find('h3', class_='base-search-card__title')),
+        'company': _text(card.find('h4', class_='base-search-card__subtitle')),
+        'location': _text(card.find('span', class_='job-search-card__location')),
+        'description': "Click to view full description",
+        'url': url_elem['href'] if url_elem else "N/A",
+        'source': 'LinkedIn',
+    }
+
+def _glassdoor_card(card):
+    title_elem = card.find('a', class_='job-link')
+    return {
+        'title': _text(title_elem),
+        'company': _text(card.find('div', class_='job-search-results__company-name')),
+        'location': _text(card.find('span', class_='location')),
+        'description': "Click to view full description",
+        'url': f"https://www.glassdoor.com{title_elem['href']}" if title_elem and 'href' in title_elem.attrs else "N/A",
+        'source': 'Glassdoor',
+    }
+
+ORIGINAL = {
+    'indeed': (('div', 'job_seen_beacon'), _indeed_card),
+    'linkedin': (('div', 'base-card'), _linkedin_card),
+    'glassdoor': (('li', 'react-job-listing'), _glassdoor_card),
+}
+
+def full_tree(name, html):
+    # What every scraper did before: build the whole page with html.parser, then search it
+    (tag, class_name), parse_card = ORIGINAL[name]
+    soup = BeautifulSoup(html, 'html.parser')
+    return [dict(parse_card(card), date_posted=DATE) for card in soup.find_all(tag, class_=class_name)]
+
+def strained(spec, html, parser):
+    return [engine.parse_card(spec, card, DATE) for card in parsing.parse_cards(html, spec.card, parser=parser)]
+
+def available_parsers():
+    parsers = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        pass
+    return parsers
+
+def best_of(fn):
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+def main():
+    for name, spec in SPECS.items():
+        html = load_fixture(name)
+        size_mb = len(html.encode('utf-8')) / 1_000_000
+
+        baseline, expected = best_of(lambda: full_tree(name, html))
+        print(f"{name}: {len(expected)} cards, {size_mb * 1000:.0f} KB")
+        print(f"  full tree   html.parser  {baseline * 1000:7.2f} ms  {size_mb / baseline:6.1f} MB/s")
+
+        for parser in available_parsers():
+            elapsed, jobs = best_of(lambda: strained(spec, html, parser))
+            same = "same output" if jobs == expected else "OUTPUT DIFFERS"
+            print(f"  cards only  {parser:<12} {elapsed * 1000:7.2f} ms  {size_mb / elapsed:6.1f} MB/s  "
+                  f"{baseline / elapsed:5.2f}x  {same}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Compare sequential vs concurrent scraping against local stub job boards.
+#
+# Run from the backend directory:
+#     python -m benchmarks.bench_scrape
+import os
+import time
+
+# Measure the network path, not the page cache
+os.environ.setdefault("SCRAPE_HTTP_CACHE", "0")
+
+from scrapers import engine
+from scrapers.sources import SPECS
+from scrapers.orchestrator import run_scrapers
+from benchmarks.stub_server import load_fixture, start_stub_server
+
+# Simulated network latency per board, in seconds
+DELAYS = {
+    'indeed': 0.6,
+    'linkedin': 0.9,
+    'glassdoor': 1.2,
+}
+
+ROUNDS = 3
+
+def main():
+    servers = []
+    for name, spec in SPECS.items():
+        server, base_url = start_stub_server(load_fixture(name), delay=DELAYS[name])
+        spec.base_url = base_url
+        servers.append(server)
+
+    sources = list(SPECS)
+    try:
+        sequential = []
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            jobs = []
+            for name in sources:
+                jobs.extend(engine.scrape(SPECS[name], "Python Developer", "Remote"))
+            sequential.append(time.perf_counter() - started)
+        sequential_count = len(jobs)
+
+        concurrent = []
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            jobs, status = run_scrapers("Python Developer", "Remote", sources)
+            concurrent.append(time.perf_counter() - started)
+        concurrent_count = len(jobs)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    best_sequential = min(sequential)
+    best_concurrent = min(concurrent)
+    print(f"slowest source delay: {max(DELAYS.values()):.2f}s, sum of delays: {sum(DELAYS.values()):.2f}s")
+    print(f"sequential: {best_sequential:.3f}s ({sequential_count} jobs)")
+    print(f"concurrent: {best_concurrent:.3f}s ({concurrent_count} jobs)")
+    print(f"speedup:    {best_sequential / best_concurrent:.2f}x")
+    print(f"per-source: {status}")
+
+if __name__ == '__main__':
+    main()
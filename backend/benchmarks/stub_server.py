@@ -0,0 +1,47 @@
+# backend/benchmarks/stub_server.py
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, f"{name}.html"), encoding='utf-8') as f:
+        return f.read()
+
+def start_stub_server(body, delay=0.0, etag=None, status=200):
+    """Serve `body` with `status` for every GET on a local port after sleeping `delay` seconds
+
+    `body` may be a callable returning the page for each request. With `etag` set, responses carry it and a matching If-None-Match gets
+    an empty 304. `server.hits` counts requests by status code. Returns
+    (server, base_url); call server.shutdown() when done.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            payload = (body() if callable(body) else body).encode('utf-8')
+            if etag is not None and self.headers.get('If-None-Match') == etag:
+                server.hits[304] = server.hits.get(304, 0) + 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            server.hits[status] = server.hits.get(status, 0) + 1
+            self.send_response(status)
+            if etag is not None:
+                self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.hits = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
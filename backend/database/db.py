@@ -1,40 +1,851 @@
 # backend/database/db.py
 import sqlite3
 import os
+import json
+import base64
+import calendar
+import datetime
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from flask import g
 
+from database import migrations, minhash
+from services import extractor, logs
+
+log = logs.get_logger(__name__)
+
 DATABASE = 'jobs.db'
 
+# Seconds a statement waits on another connection's write lock before failing
+DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "10"))
+
+# Idle connections kept open for reuse; more are opened under load and closed when returned
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+
+# Prepared statements each connection keeps compiled
+DB_CACHED_STATEMENTS = 256
+
+# Applied to every connection. WAL lets readers carry on during a scrape's writes;
+# NORMAL sync is durable in WAL mode except across power loss
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    f'PRAGMA cache_size = -{int(os.getenv("DB_CACHE_KIB", "16384"))}',
+    f'PRAGMA mmap_size = {int(os.getenv("DB_MMAP_BYTES", str(256 * 1024 * 1024)))}',
+)
+
+def connect(path=None):
+    """New connection with the pragmas applied, returning rows as sqlite3.Row
+
+    The connection may move between threads but must only be used by one at
+    a time; prefer connection() or get_db(), which reuse pooled ones.
+    """
+    conn = sqlite3.connect(
+        path or DATABASE, timeout=DB_BUSY_TIMEOUT, check_same_thread=False, cached_statements=DB_CACHED_STATEMENTS
+    )
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    # Descriptions are stored compressed; the full-text index reads them through inflate(),
+    # so every connection that writes jobs or searches them needs these (see migrations.require_functions)
+    conn.create_function('deflate', 1, compress_text, deterministic=True)
+    conn.create_function('inflate', 1, decompress_text, deterministic=True)
+    return conn
+
+def compress_text(text):
+    return zlib.compress(text.encode('utf-8')) if text is not None else None
+
+def decompress_text(blob):
+    # Plain strings pass through, e.g. rows written before descriptions were compressed
+    if blob is None or isinstance(blob, str):
+        return blob
+    return zlib.decompress(blob).decode('utf-8')
+
+def day_to_epoch(day):
+    """Epoch seconds of midnight UTC on a YYYY-MM-DD day; raises ValueError for anything else"""
+    try:
+        return calendar.timegm(datetime.datetime.strptime(day, '%Y-%m-%d').timetuple())
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date: {day}")
+
+class ConnectionPool:
+    """Reusable connections, each handed to one thread at a time
+
+    Keeping connections open preserves their page cache, memory map and
+    compiled statements between requests. A shared pool rather than one
+    connection per thread, since the development server starts a new thread
+    for every request.
+    """
+    def __init__(self, path, size=DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return connect(self.path)
+
+    def release(self, conn):
+        # Never hand on a connection in the middle of someone else's transaction
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+# One pool per database file
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _pool(path=None):
+    path = path or DATABASE
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path)
+        return pool
+
+@contextmanager
+def connection(path=None):
+    """Pooled connection for code running outside a request, e.g. background workers"""
+    pool = _pool(path)
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
 def get_db():
     if 'db' not in g:
-        g.db = sqlite3.connect(DATABASE)
-        g.db.row_factory = sqlite3.Row
+        g.db_pool = _pool()
+        g.db = g.db_pool.acquire()
     return g.db
 
 def close_db(e=None):
+    """Return the request's connection to the pool; registered as an app-context teardown"""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        g.pop('db_pool').release(db)
+
+# Columns returned to API clients for each job
+JOB_FIELDS = (
+    'id', 'title', 'company', 'location', 'description', 'url', 'source', 'date_posted', 'canonical_id',
+    'seniority', 'salary_min', 'salary_max', 'skills',
+)
+
+# The same fields, in the same order, as stored in the normalized tables
+JOB_COLUMNS = ', '.join([
+    'jobs.id', 'jobs.title', 'companies.name', 'locations.name', 'jobs.description', 'jobs.url', 'sources.name',
+    "date(jobs.posted_at, 'unixepoch')", 'jobs.canonical_id', 'jobs.seniority', 'jobs.salary_min', 'jobs.salary_max',
+    """(SELECT group_concat(name, '|') FROM (
+        SELECT skills.name FROM job_skills JOIN skills ON skills.id = job_skills.skill_id
+        WHERE job_skills.job_id = jobs.id ORDER BY skills.name
+    ))""",
+])
+JOB_JOINS = """
+    JOIN companies ON companies.id = jobs.company_id
+    JOIN locations ON locations.id = jobs.location_id
+    JOIN sources ON sources.id = jobs.source_id
+"""
+
+# Seconds a scrape run's result list stays available for paging
+SCRAPE_RUN_TTL = int(os.getenv("SCRAPE_RUN_TTL", str(24 * 3600)))
+
+# Seconds between last_seen refreshes of a posting that keeps showing up, to spare rewrites
+LAST_SEEN_RESOLUTION = 3600
+
+# Candidates from the LSH buckets checked against each new posting; bounds the cost of very common titles
+CLUSTER_MAX_CANDIDATES = 200
+
+# BM25 column weights for search: a hit in the title counts ten times one in the description
+SEARCH_WEIGHTS = (10.0, 1.0)
+
+# Words too common in job titles to say anything about the market
+TITLE_STOPWORDS = {'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'}
+
+# Query parameters that only record how a posting was reached, never which posting it is
+TRACKING_PARAMS = {'position', 'pageNum', 'refId', 'trackingId', 'trk', 'from', 'vjs', 'tk', 'advn', 'adid'}
 
 def initialize_db():
-    # Create the database if it doesn't exist
-    if not os.path.exists(DATABASE):
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
+    """Create the schema, or upgrade an existing database to the newest version"""
+    conn = connect()
+    try:
+        applied = migrations.migrate(conn)
+    finally:
+        conn.close()
+    if applied:
+        log.info('migrations_applied', versions=applied)
+
+def normalize_url(url):
+    """Canonical form of a posting URL: lowercase host, no fragment, tracking parameters or trailing slash"""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith('utm_')
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), urlencode(query), ''))
+
+def job_key(job):
+    """Deduplication key for a job: its normalized URL, or its identifying fields when it has none"""
+    url = job.get('url') or ''
+    if url and url != 'N/A':
+        return normalize_url(url)
+    return '|'.join([job['source'], job['title'], job['company'], job['location']]).lower()
+
+def upsert_jobs(db, jobs):
+    """Insert new jobs and refresh changed ones in one transaction; returns inserted, updated and skipped counts"""
+    batch = {}
+    for job in jobs:
+        batch[job_key(job)] = job
+    if not batch:
+        return {'inserted': 0, 'updated': 0, 'skipped': len(jobs)}
+    
+    keys = list(batch)
+    placeholders = ','.join('?' * len(keys))
+    descriptions = {key: compress_text(job['description']) for key, job in batch.items()}
+    now = int(time.time())
+    
+    with db:
+        # Take the write lock before reading which rows exist, so a concurrent writer of the same URLs waits
+        if not db.in_transaction:
+            db.execute('BEGIN IMMEDIATE')
+        existing = {
+            row[0]: row for row in db.execute(
+                f'SELECT url_key, title, description, enriched_at FROM jobs WHERE url_key IN ({placeholders})', keys
+            )
+        }
+        # Rows whose extracted details may differ: new ones, retitled ones and unenriched ones with a new description
+        stale = [
+            key for key in keys
+            if key not in existing or existing[key][1] != batch[key]['title']
+            or (existing[key][3] is None and existing[key][2] != descriptions[key])
+        ]
+        
+        company_ids = _intern(db, 'companies', {job['company'] for job in batch.values()})
+        location_ids = _intern(db, 'locations', {job['location'] for job in batch.values()})
+        source_ids = _intern(db, 'sources', {job['source'] for job in batch.values()})
+        
+        # rowcount sums the rows each statement changed, leaving out trigger writes such as the FTS index
+        cursor = db.executemany(
+            '''
+            INSERT INTO jobs (title, company_id, location_id, source_id, description, url, url_key,
+                              posted_at, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url_key) DO UPDATE SET
+                title = excluded.title,
+                company_id = excluded.company_id,
+                location_id = excluded.location_id,
+                description = CASE WHEN jobs.enriched_at IS NULL THEN excluded.description ELSE jobs.description END,
+                url = excluded.url
+            WHERE (jobs.title, jobs.company_id, jobs.location_id, jobs.url)
+                IS NOT (excluded.title, excluded.company_id, excluded.location_id, excluded.url)
+                OR (jobs.enriched_at IS NULL AND jobs.description IS NOT excluded.description)
+            ''',
+            [
+                (
+                    job['title'], company_ids[job['company']], location_ids[job['location']], source_ids[job['source']],
+                    descriptions[key], job['url'], key, day_to_epoch(job['date_posted']), now, now
+                )
+                for key, job in batch.items()
+            ]
+        )
+        changed = cursor.rowcount
         
-        # Create tables
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            company TEXT NOT NULL,
-            location TEXT NOT NULL,
-            description TEXT,
-            url TEXT NOT NULL,
-            source TEXT NOT NULL,
-            date_posted TEXT
+        # Postings seen again only get last_seen bumped, and at most once per LAST_SEEN_RESOLUTION
+        db.execute(
+            f'UPDATE jobs SET last_seen = ? WHERE url_key IN ({placeholders}) AND last_seen < ?',
+            [now, *keys, now - LAST_SEEN_RESOLUTION]
         )
-        ''')
         
-        conn.commit()
-        conn.close()
\ No newline at end of file
+        # Title-term counts: new postings add their terms, retitled ones swap old for new
+        terms = Counter()
+        for key, job in batch.items():
+            old_title = existing[key][1] if key in existing else None
+            if old_title == job['title']:
+                continue
+            if old_title is not None:
+                terms.subtract(title_terms(old_title))
+            terms.update(title_terms(job['title']))
+        _add_title_terms(db, terms)
+        
+        if stale:
+            stale_placeholders = ','.join('?' * len(stale))
+            ids = db.execute(f'SELECT url_key, id FROM jobs WHERE url_key IN ({stale_placeholders}) ORDER BY id', stale)
+            stale_jobs = {key: dict(batch[key], id=job_id) for key, job_id in ids}
+            assign_clusters(db, [job for key, job in stale_jobs.items() if key not in existing])
+            for key, job in stale_jobs.items():
+                # Enriched rows keep the detail-page description, so extract from that rather than the card's
+                if key in existing and existing[key][3] is not None:
+                    job['description'] = decompress_text(existing[key][2])
+            extract_details(db, stale_jobs.values())
+    
+    inserted = len(keys) - len(existing)
+    updated = changed - inserted
+    return {'inserted': inserted, 'updated': updated, 'skipped': len(jobs) - inserted - updated}
+
+def assign_clusters(db, jobs):
+    """Point each newly stored job (id, title, company, location; oldest first) at the canonical id of its duplicate"""
+    new_clusters = 0
+    for job in jobs:
+        canonical_id = job['id']
+        block = minhash.block_key(job)
+        sig = minhash.signature(minhash.shingles(job)) if block is not None else None
+        if sig is not None:
+            source_id = db.execute('SELECT source_id FROM jobs WHERE id = ?', (job['id'],)).fetchone()[0]
+            keys = minhash.band_keys(sig, block)
+            values = ','.join('(?, ?)' for _ in keys)
+            candidates = db.execute(
+                f'''
+                SELECT DISTINCT job_signatures.signature, jobs.canonical_id, jobs.source_id
+                FROM (VALUES {values}) AS keys
+                JOIN job_lsh ON job_lsh.band = keys.column1 AND job_lsh.bucket = keys.column2
+                JOIN job_signatures ON job_signatures.job_id = job_lsh.job_id
+                JOIN jobs ON jobs.id = job_lsh.job_id
+                LIMIT ?
+                ''',
+                [value for key in keys for value in key] + [CLUSTER_MAX_CANDIDATES]
+            ).fetchall()
+            matches = {
+                candidate_id for blob, candidate_id, candidate_source in candidates
+                if candidate_source != source_id
+                and minhash.similarity(sig, minhash.from_blob(blob)) >= minhash.DUPLICATE_THRESHOLD
+            }
+            if matches:
+                placeholders = ','.join('?' * len(matches))
+                matches -= {row[0] for row in db.execute(
+                    f'SELECT DISTINCT canonical_id FROM jobs WHERE canonical_id IN ({placeholders}) AND source_id = ?',
+                    [*matches, source_id]
+                )}
+            if matches:
+                canonical_id = min(matches)
+            db.execute(
+                'INSERT INTO job_signatures (job_id, signature) VALUES (?, ?) '
+                'ON CONFLICT(job_id) DO UPDATE SET signature = excluded.signature',
+                (job['id'], minhash.to_blob(sig))
+            )
+            db.executemany(
+                'INSERT OR IGNORE INTO job_lsh (band, bucket, job_id) VALUES (?, ?, ?)',
+                [(band, bucket, job['id']) for band, bucket in keys]
+            )
+        db.execute('UPDATE jobs SET canonical_id = ? WHERE id = ?', (canonical_id, job['id']))
+        if canonical_id == job['id']:
+            new_clusters += 1
+    
+    if new_clusters:
+        db.execute(
+            '''
+            INSERT INTO job_stats(dimension, value, count) VALUES ('unique', 'jobs', ?)
+            ON CONFLICT(dimension, value) DO UPDATE SET count = count + excluded.count
+            ''',
+            (new_clusters,)
+        )
+
+def extract_details(db, jobs):
+    """Run the local extractor over `jobs` and store their skills, seniority and salary range
+
+    `jobs` need id, title and description. Replaces whatever was stored for
+    them before.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+    details = [(job['id'], extractor.extract(job['title'], job['description'])) for job in jobs]
+    skill_ids = _intern(db, 'skills', {skill for _, found in details for skill in found['skills']})
+    db.executemany('DELETE FROM job_skills WHERE job_id = ?', [(job_id,) for job_id, _ in details])
+    db.executemany(
+        'INSERT INTO job_skills (skill_id, job_id) VALUES (?, ?)',
+        [(skill_ids[skill], job_id) for job_id, found in details for skill in found['skills']]
+    )
+    db.executemany(
+        '''
+        UPDATE jobs SET seniority = ?, salary_min = ?, salary_max = ?
+        WHERE id = ? AND (seniority, salary_min, salary_max) IS NOT (?, ?, ?)
+        ''',
+        [
+            (found['seniority'], found['salary_min'], found['salary_max'], job_id,
+             found['seniority'], found['salary_min'], found['salary_max'])
+            for job_id, found in details
+        ]
+    )
+
+def _intern(db, table, names):
+    """Ids of `names` in a dimension table, adding the names not seen before"""
+    names = list(names)
+    if not names:
+        return {}
+    db.executemany(f'INSERT OR IGNORE INTO {table} (name) VALUES (?)', [(name,) for name in names])
+    placeholders = ','.join('?' * len(names))
+    return dict(db.execute(f'SELECT name, id FROM {table} WHERE name IN ({placeholders})', names).fetchall())
+
+def title_terms(title):
+    """Words and adjacent word pairs of a job title, lowercased and without stopwords"""
+    words = [word for word in re.findall(r"[a-z0-9][a-z0-9+#]*", title.lower()) if word not in TITLE_STOPWORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+def _add_title_terms(db, terms):
+    db.executemany(
+        '''
+        INSERT INTO job_stats(dimension, value, count) VALUES ('title_term', ?, ?)
+        ON CONFLICT(dimension, value) DO UPDATE SET count = count + excluded.count
+        ''',
+        [(term, delta) for term, delta in terms.items() if delta]
+    )
+
+def market_stats(db, top_n=30):
+    """Top values per dimension from the running counts, without touching the jobs table
+
+    Returns the total job count, the count with cross-board duplicates
+    collapsed (unique_total), plus (value, count) lists for company,
+    location, source, title_term, skill and seniority (largest first) and
+    day (most recent first).
+    """
+    stats = {}
+    for dimension in ('company', 'location', 'source', 'title_term', 'skill', 'seniority'):
+        stats[dimension] = [tuple(row) for row in db.execute(
+            'SELECT value, count FROM job_stats WHERE dimension = ? AND count > 0 ORDER BY count DESC LIMIT ?',
+            (dimension, top_n)
+        )]
+    stats['day'] = [tuple(row) for row in db.execute(
+        "SELECT value, count FROM job_stats WHERE dimension = 'day' AND count > 0 ORDER BY value DESC LIMIT ?",
+        (top_n,)
+    )]
+    stats['total'] = db.execute(
+        "SELECT COALESCE(SUM(count), 0) FROM job_stats WHERE dimension = 'source'"
+    ).fetchone()[0]
+    stats['unique_total'] = db.execute(
+        "SELECT COALESCE(SUM(count), 0) FROM job_stats WHERE dimension = 'unique'"
+    ).fetchone()[0]
+    return stats
+
+def job_analytics(db, top_n=10, **filters):
+    """Counts of jobs per source, location, company, skill, seniority and day
+
+    Takes the _job_filters() keywords. Without any filter the counts come
+    straight from job_stats; otherwise each distribution is one GROUP BY
+    over the matching jobs. Lists hold {'name', 'count'} dicts, largest
+    first, except by_day, which holds the latest top_n days, oldest first.
+    """
+    clauses, params = _job_filters(**filters)
+    if not clauses:
+        return _analytics_from_stats(db, top_n)
+    
+    matching = f"FROM jobs WHERE {' AND '.join(clauses)}"
+    
+    def grouped(dimension_table, column):
+        return _named_counts(db.execute(
+            f"""
+            SELECT {dimension_table}.name, counts.count FROM (
+                SELECT jobs.{column} AS id, COUNT(*) AS count {matching} GROUP BY jobs.{column}
+            ) AS counts JOIN {dimension_table} ON {dimension_table}.id = counts.id
+            ORDER BY counts.count DESC, {dimension_table}.name LIMIT ?
+            """,
+            params + [top_n]
+        ))
+    
+    total, companies, locations = db.execute(
+        f"SELECT COUNT(*), COUNT(DISTINCT jobs.company_id), COUNT(DISTINCT jobs.location_id) {matching}", params
+    ).fetchone()
+    days = _named_counts(db.execute(
+        f"""
+        SELECT date(jobs.posted_at, 'unixepoch') AS day, COUNT(*) {matching}
+        GROUP BY jobs.posted_at ORDER BY jobs.posted_at DESC LIMIT ?
+        """,
+        params + [top_n]
+    ))
+    return {
+        'total': total,
+        'company_count': companies,
+        'location_count': locations,
+        'by_source': grouped('sources', 'source_id'),
+        'by_location': grouped('locations', 'location_id'),
+        'by_company': grouped('companies', 'company_id'),
+        'by_skill': _named_counts(db.execute(
+            f"""
+            SELECT skills.name, COUNT(*) AS count FROM job_skills JOIN skills ON skills.id = job_skills.skill_id
+            WHERE job_skills.job_id IN (SELECT jobs.id {matching})
+            GROUP BY job_skills.skill_id ORDER BY count DESC, skills.name LIMIT ?
+            """,
+            params + [top_n]
+        )),
+        'by_seniority': _named_counts(db.execute(
+            f"""
+            SELECT jobs.seniority, COUNT(*) AS count {matching} AND jobs.seniority IS NOT NULL
+            GROUP BY jobs.seniority ORDER BY count DESC, jobs.seniority
+            """,
+            params
+        )),
+        'by_day': days[::-1],
+    }
+
+def _analytics_from_stats(db, top_n):
+    def top(dimension, order='count DESC, value', limit=top_n):
+        return _named_counts(db.execute(
+            f"SELECT value, count FROM job_stats WHERE dimension = ? AND count > 0 ORDER BY {order} LIMIT ?",
+            (dimension, limit)
+        ))
+    
+    def distinct(dimension):
+        return db.execute(
+            'SELECT COUNT(*) FROM job_stats WHERE dimension = ? AND count > 0', (dimension,)
+        ).fetchone()[0]
+    
+    return {
+        'total': sum(entry['count'] for entry in top('source', limit=-1)),
+        'company_count': distinct('company'),
+        'location_count': distinct('location'),
+        'by_source': top('source'),
+        'by_location': top('location'),
+        'by_company': top('company'),
+        'by_skill': top('skill'),
+        'by_seniority': top('seniority', limit=-1),
+        'by_day': top('day', order='value DESC')[::-1],
+    }
+
+def _named_counts(rows):
+    return [{'name': name, 'count': count} for name, count in rows]
+
+def row_to_job(row):
+    """API dict of a row selected with JOB_COLUMNS (extra trailing columns are ignored)"""
+    job = dict(zip(JOB_FIELDS, row))
+    job['description'] = decompress_text(job['description'])
+    job['skills'] = job['skills'].split('|') if job['skills'] else []
+    return job
+
+def encode_cursor(job):
+    """Opaque cursor pointing just past `job` in newest-first order"""
+    raw = json.dumps([day_to_epoch(job['date_posted']), job['id']]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on anything it didn't produce"""
+    try:
+        posted_at, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return int(posted_at), int(job_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def _job_filters(source=None, company=None, location=None, date_from=None, date_to=None, collapse=False,
+                 skill=None, seniority=None, min_salary=None, text=None, run_id=None):
+    """WHERE clauses and their parameters for the listing filters; raises ValueError for a bad date
+
+    `text` keeps jobs matching a full-text query on title or description,
+    and `run_id` the jobs one scrape run found.
+    """
+    filters = dict(source=source, company=company, location=location, date_from=date_from, date_to=date_to,
+                   skill=skill, seniority=seniority, min_salary=min_salary, text=text, run_id=run_id)
+    clauses, params = _filter_clauses('jobs', **filters)
+    if collapse:
+        clause, collapse_params = _collapse_clause(**filters)
+        clauses.append(clause)
+        params.extend(collapse_params)
+    return clauses, params
+
+def _collapse_clause(**filters):
+    # A job stands for its cluster when no other matching job of the cluster is older, so
+    # filtering out a cluster's canonical job doesn't hide the rest of it
+    clauses, params = _filter_clauses('dup', **filters)
+    where = ''.join(f' AND {clause}' for clause in clauses)
+    return (
+        f'NOT EXISTS (SELECT 1 FROM jobs AS dup WHERE dup.canonical_id = jobs.canonical_id AND dup.id < jobs.id{where})',
+        params
+    )
+
+def _filter_clauses(table, source=None, company=None, location=None, date_from=None, date_to=None,
+                    skill=None, seniority=None, min_salary=None, text=None, run_id=None):
+    clauses = []
+    params = []
+    if run_id is not None:
+        clauses.append(f'{table}.id IN (SELECT job_id FROM scrape_run_jobs WHERE run_id = ?)')
+        params.append(run_id)
+    if source:
+        clauses.append(f'{table}.source_id = (SELECT id FROM sources WHERE name = ?)')
+        params.append(source)
+    if company:
+        clauses.append(f'{table}.company_id IN (SELECT id FROM companies WHERE name = ? COLLATE NOCASE)')
+        params.append(company)
+    if location:
+        clauses.append(f'{table}.location_id IN (SELECT id FROM locations WHERE name LIKE ?)')
+        params.append(f"%{location}%")
+    if skill:
+        clauses.append(f'{table}.id IN (SELECT job_id FROM job_skills WHERE skill_id = (SELECT id FROM skills WHERE name = ?))')
+        params.append(skill)
+    if seniority:
+        clauses.append(f'{table}.seniority = ?')
+        params.append(seniority)
+    if min_salary is not None:
+        clauses.append(f'{table}.salary_max >= ?')
+        params.append(min_salary)
+    if date_from:
+        clauses.append(f'{table}.posted_at >= ?')
+        params.append(day_to_epoch(date_from))
+    if date_to:
+        clauses.append(f'{table}.posted_at <= ?')
+        params.append(day_to_epoch(date_to))
+    if text and fts_query(text):
+        clauses.append(f'{table}.id IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)')
+        params.append(fts_query(text))
+    return clauses, params
+
+def query_jobs(db, limit, cursor=None, source=None, company=None, location=None, date_from=None, date_to=None,
+               collapse=False, skill=None, seniority=None, min_salary=None, run_id=None):
+    """One newest-first page of jobs matching the filters
+
+    Keyset pagination on (posted_at, id), so every page costs the same no
+    matter how deep it is. Filters on company, location and source are
+    resolved against the small dimension tables first; `skill` matches the
+    extracted skills, `min_salary` jobs whose range reaches it and `run_id`
+    the jobs one scrape found. With `collapse`, each cluster of cross-board
+    duplicates is listed once, as its oldest matching job. Returns (jobs,
+    next_cursor); next_cursor is None on the last page.
+    """
+    clauses, params = _job_filters(
+        source=source, company=company, location=location, date_from=date_from, date_to=date_to,
+        collapse=collapse, skill=skill, seniority=seniority, min_salary=min_salary, run_id=run_id
+    )
+    if cursor:
+        last_posted, last_id = decode_cursor(cursor)
+        clauses.append('(jobs.posted_at < ? OR (jobs.posted_at = ? AND jobs.id < ?))')
+        params.extend([last_posted, last_posted, last_id])
+    
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    rows = db.execute(
+        f"SELECT {JOB_COLUMNS} FROM jobs {JOB_JOINS} {where} ORDER BY jobs.posted_at DESC, jobs.id DESC LIMIT ?",
+        params + [limit + 1]
+    ).fetchall()
+    
+    jobs = [row_to_job(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(jobs[-1]) if len(rows) > limit else None
+    return jobs, next_cursor
+
+def jobs_by_keys(db, keys, chunk_size=500):
+    """Jobs whose url_key is in `keys`, newest first"""
+    keys = list(keys)
+    jobs = []
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start:start + chunk_size]
+        placeholders = ','.join('?' * len(chunk))
+        rows = db.execute(f"SELECT {JOB_COLUMNS} FROM jobs {JOB_JOINS} WHERE jobs.url_key IN ({placeholders})", chunk)
+        jobs.extend(row_to_job(row) for row in rows)
+    jobs.sort(key=lambda job: (job['date_posted'] or '', job['id']), reverse=True)
+    return jobs
+
+def fts_query(text):
+    """Turn free text into an FTS5 query matching every word, ignoring FTS operators"""
+    terms = ['"' + term.replace('"', '""') + '"' for term in text.split()]
+    return ' '.join(terms)
+
+def search_jobs(db, text, limit, offset=0, source=None, collapse=False):
+    """Jobs matching `text` in title or description, best BM25 match first
+
+    Each job carries a highlighted `snippet` of its description. With
+    `collapse`, only the oldest matching job of each duplicate cluster is returned.
+    Returns (jobs, next_offset); next_offset is None on the last page.
+    """
+    query = fts_query(text)
+    if not query:
+        return [], None
+    
+    clauses = ['jobs_fts MATCH ?']
+    params = [query]
+    if source:
+        clauses.append('jobs.source_id = (SELECT id FROM sources WHERE name = ?)')
+        params.append(source)
+    if collapse:
+        clause, collapse_params = _collapse_clause(source=source, text=text)
+        clauses.append(clause)
+        params.extend(collapse_params)
+    
+    rows = db.execute(
+        f"""
+        SELECT {JOB_COLUMNS}, snippet(jobs_fts, 1, '<b>', '</b>', '...', 16) AS snippet
+        FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid {JOB_JOINS}
+        WHERE {' AND '.join(clauses)}
+        ORDER BY bm25(jobs_fts, ?, ?)
+        LIMIT ? OFFSET ?
+        """,
+        params + list(SEARCH_WEIGHTS) + [limit + 1, offset]
+    ).fetchall()
+    
+    jobs = []
+    for row in rows[:limit]:
+        job = row_to_job(row)
+        job['snippet'] = row['snippet']
+        jobs.append(job)
+    next_offset = offset + limit if len(rows) > limit else None
+    return jobs, next_offset
+
+def jobs_by_ids(db, ids):
+    """Jobs with the given ids, in the order the ids were given"""
+    ids = list(ids)
+    if not ids:
+        return []
+    placeholders = ','.join('?' * len(ids))
+    rows = db.execute(f"SELECT {JOB_COLUMNS} FROM jobs {JOB_JOINS} WHERE jobs.id IN ({placeholders})", ids)
+    by_id = {job['id']: job for job in map(row_to_job, rows)}
+    return [by_id[job_id] for job_id in ids if job_id in by_id]
+
+def get_job(db, job_id):
+    """One job by id, or None"""
+    jobs = jobs_by_ids(db, [job_id])
+    return jobs[0] if jobs else None
+
+def pending_enrichment(db, sources, placeholder, limit):
+    """Jobs from `sources` whose description is still `placeholder` and whose detail page was never fetched"""
+    sources = list(sources)
+    placeholders = ','.join('?' * len(sources))
+    rows = db.execute(
+        f"""
+        SELECT {JOB_COLUMNS} FROM jobs {JOB_JOINS}
+        WHERE jobs.enriched_at IS NULL AND jobs.description = ? AND sources.name IN ({placeholders})
+        ORDER BY jobs.id DESC LIMIT ?
+        """,
+        [compress_text(placeholder), *sources, limit]
+    )
+    return [row_to_job(row) for row in rows]
+
+def is_enriched(db, job_id):
+    row = db.execute('SELECT enriched_at FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    return row is None or row[0] is not None
+
+def set_enriched(db, job_id, description, enriched_at):
+    """Record a detail-page fetch, replacing the description unless `description` is None
+
+    A new description also replaces the details extracted from the card.
+
+    Returns False if the job was already enriched (or no longer exists).
+    """
+    with db:
+        cursor = db.execute(
+            'UPDATE jobs SET description = COALESCE(?, description), enriched_at = ? WHERE id = ? AND enriched_at IS NULL',
+            (compress_text(description), int(enriched_at), job_id)
+        )
+        if cursor.rowcount and description is not None:
+            title = db.execute('SELECT title FROM jobs WHERE id = ?', (job_id,)).fetchone()[0]
+            extract_details(db, [{'id': job_id, 'title': title, 'description': description}])
+    return cursor.rowcount > 0
+
+def iter_jobs(db, batch_size=1000):
+    """Every stored job, fetched in batches so the whole table is never held at once"""
+    cursor = db.execute(f"SELECT {JOB_COLUMNS} FROM jobs {JOB_JOINS} ORDER BY jobs.id")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            yield row_to_job(row)
+
+def search_signature(job_title, location, sources):
+    """Canonical (job_title, location, sources) so equivalent searches share one saved row"""
+    return job_title.strip().lower(), location.strip().lower(), json.dumps(sorted(set(sources)))
+
+def saved_search_to_dict(row):
+    return {
+        'id': row['id'],
+        'job_title': row['job_title'],
+        'location': row['location'],
+        'sources': json.loads(row['sources']),
+        'interval_seconds': row['interval_seconds'],
+        'last_crawled_at': row['last_crawled_at'],
+        'next_crawl_at': row['next_crawl_at'],
+    }
+
+def save_search(db, job_title, location, sources, interval_seconds, now):
+    """Register a search for background crawling, or update its interval; returns its id"""
+    signature = search_signature(job_title, location, sources)
+    with db:
+        db.execute(
+            '''
+            INSERT INTO saved_searches (job_title, location, sources, interval_seconds, next_crawl_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(job_title, location, sources) DO UPDATE SET interval_seconds = excluded.interval_seconds
+            ''',
+            signature + (interval_seconds, now)
+        )
+    return db.execute(
+        'SELECT id FROM saved_searches WHERE job_title = ? AND location = ? AND sources = ?', signature
+    ).fetchone()[0]
+
+def list_saved_searches(db):
+    return [saved_search_to_dict(row) for row in db.execute('SELECT * FROM saved_searches ORDER BY id')]
+
+def delete_saved_search(db, search_id):
+    """Forget a saved search and its job links; returns False if there was none"""
+    with db:
+        db.execute('DELETE FROM saved_search_jobs WHERE search_id = ?', (search_id,))
+        deleted = db.execute('DELETE FROM saved_searches WHERE id = ?', (search_id,)).rowcount
+    return deleted > 0
+
+def due_searches(db, now):
+    return [saved_search_to_dict(row) for row in db.execute(
+        'SELECT * FROM saved_searches WHERE next_crawl_at <= ? ORDER BY next_crawl_at', (now,)
+    )]
+
+def fresh_search(db, job_title, location, sources, now):
+    """The saved search matching these terms if its last crawl is within its interval, else None"""
+    row = db.execute(
+        'SELECT * FROM saved_searches WHERE job_title = ? AND location = ? AND sources = ?',
+        search_signature(job_title, location, sources)
+    ).fetchone()
+    if row is None or row['last_crawled_at'] is None or now - row['last_crawled_at'] > row['interval_seconds']:
+        return None
+    return saved_search_to_dict(row)
+
+def schedule_search(db, search_id, next_crawl_at, crawled_at=None):
+    with db:
+        if crawled_at is None:
+            db.execute('UPDATE saved_searches SET next_crawl_at = ? WHERE id = ?', (next_crawl_at, search_id))
+        else:
+            db.execute(
+                'UPDATE saved_searches SET last_crawled_at = ?, next_crawl_at = ? WHERE id = ?',
+                (crawled_at, next_crawl_at, search_id)
+            )
+
+def link_search_jobs(db, search_id, job_ids):
+    with db:
+        db.executemany(
+            'INSERT OR IGNORE INTO saved_search_jobs (search_id, job_id) VALUES (?, ?)',
+            [(search_id, job_id) for job_id in job_ids]
+        )
+
+def saved_search_jobs(db, search_id, limit):
+    """Newest jobs found by a saved search"""
+    rows = db.execute(
+        f"""
+        SELECT {JOB_COLUMNS}
+        FROM saved_search_jobs JOIN jobs ON jobs.id = saved_search_jobs.job_id {JOB_JOINS}
+        WHERE saved_search_jobs.search_id = ?
+        ORDER BY jobs.posted_at DESC, jobs.id DESC
+        LIMIT ?
+        """,
+        (search_id, limit)
+    )
+    return [row_to_job(row) for row in rows]
+
+def create_run(db, now):
+    """Start recording a scrape run's jobs, dropping runs older than SCRAPE_RUN_TTL; returns its id"""
+    with db:
+        expired = 'SELECT id FROM scrape_runs WHERE created_at < ?'
+        db.execute(f'DELETE FROM scrape_run_jobs WHERE run_id IN ({expired})', (int(now) - SCRAPE_RUN_TTL,))
+        db.execute('DELETE FROM scrape_runs WHERE created_at < ?', (int(now) - SCRAPE_RUN_TTL,))
+        return db.execute('INSERT INTO scrape_runs (created_at) VALUES (?)', (int(now),)).lastrowid
+
+def link_run_jobs(db, run_id, job_ids):
+    with db:
+        db.executemany(
+            'INSERT OR IGNORE INTO scrape_run_jobs (run_id, job_id) VALUES (?, ?)',
+            [(run_id, job_id) for job_id in job_ids]
+        )
+
+def is_known_job(db, job):
+    return db.execute('SELECT 1 FROM jobs WHERE url_key = ?', (job_key(job),)).fetchone() is not None
@@ -0,0 +1,431 @@
+# backend/database/migrations.py
+import sqlite3
+import time
+from collections import Counter
+
+from database import db
+
+def run_script(conn, script):
+    """Execute each statement of `script` on `conn` inside the caller's transaction
+
+    Unlike executescript(), this never commits, so a migration either applies
+    completely or not at all.
+    """
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ''
+    if statement.strip():
+        conn.execute(statement)
+
+def _v1_baseline(conn):
+    # The schema as it stood before versioning. Every step is idempotent, so
+    # databases created by earlier releases are brought level with new ones
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        company TEXT NOT NULL,
+        location TEXT NOT NULL,
+        description TEXT,
+        url TEXT NOT NULL,
+        source TEXT NOT NULL,
+        date_posted TEXT,
+        url_key TEXT,
+        enriched_at REAL
+    )
+    ''')
+
+    # Databases created before deduplication lack url_key: add it, backfill it and
+    # drop the repeat rows so the unique index can be built
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(jobs)')]
+    if 'url_key' not in columns:
+        conn.execute('ALTER TABLE jobs ADD COLUMN url_key TEXT')
+    # enriched_at records when the detail page was fetched for boards whose cards carry no description
+    if 'enriched_at' not in columns:
+        conn.execute('ALTER TABLE jobs ADD COLUMN enriched_at REAL')
+
+    rows = conn.execute(
+        'SELECT id, title, company, location, url, source FROM jobs WHERE url_key IS NULL'
+    ).fetchall()
+    if rows:
+        conn.executemany(
+            'UPDATE jobs SET url_key = ? WHERE id = ?',
+            [(db.job_key({'title': r[1], 'company': r[2], 'location': r[3], 'url': r[4], 'source': r[5]}), r[0]) for r in rows]
+        )
+        conn.execute('DELETE FROM jobs WHERE id NOT IN (SELECT MIN(id) FROM jobs GROUP BY url_key)')
+
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_url_key ON jobs(url_key)')
+
+    # Running job counts per company, location, source, day and title term for the
+    # insights endpoint; title terms need tokenizing, so upsert_jobs maintains those
+    has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'job_stats'").fetchone()
+    run_script(conn, '''
+    CREATE TABLE IF NOT EXISTS job_stats (
+        dimension TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (dimension, value)
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_stats_top ON job_stats(dimension, count DESC);
+    ''')
+    if not has_stats:
+        terms = Counter()
+        for (title,) in conn.execute('SELECT title FROM jobs').fetchall():
+            terms.update(db.title_terms(title))
+        db._add_title_terms(conn, terms)
+
+    # Searches the background crawler keeps warm, and the jobs each one has found
+    run_script(conn, '''
+    CREATE TABLE IF NOT EXISTS saved_searches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_title TEXT NOT NULL,
+        location TEXT NOT NULL,
+        sources TEXT NOT NULL,
+        interval_seconds INTEGER NOT NULL,
+        last_crawled_at REAL,
+        next_crawl_at REAL NOT NULL,
+        UNIQUE (job_title, location, sources)
+    );
+    CREATE INDEX IF NOT EXISTS idx_saved_searches_due ON saved_searches(next_crawl_at);
+    CREATE TABLE IF NOT EXISTS saved_search_jobs (
+        search_id INTEGER NOT NULL REFERENCES saved_searches(id) ON DELETE CASCADE,
+        job_id INTEGER NOT NULL,
+        PRIMARY KEY (search_id, job_id)
+    ) WITHOUT ROWID;
+    ''')
+
+def _v2_normalize(conn):
+    # Company, location and source names move to interned dimension tables,
+    # dates become epoch seconds and descriptions are stored zlib-compressed.
+    # The full-text index and the stats triggers are rebuilt on top
+    run_script(conn, '''
+    DROP TRIGGER IF EXISTS jobs_fts_insert;
+    DROP TRIGGER IF EXISTS jobs_fts_delete;
+    DROP TRIGGER IF EXISTS jobs_fts_update;
+    DROP TRIGGER IF EXISTS jobs_stats_insert;
+    DROP TRIGGER IF EXISTS jobs_stats_delete;
+    DROP TRIGGER IF EXISTS jobs_stats_update;
+    DROP TABLE IF EXISTS jobs_fts;
+
+    CREATE TABLE companies (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+    CREATE TABLE locations (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+    CREATE TABLE sources (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+    CREATE INDEX idx_companies_name_nocase ON companies(name COLLATE NOCASE);
+    INSERT INTO companies (name) SELECT DISTINCT company FROM jobs;
+    INSERT INTO locations (name) SELECT DISTINCT location FROM jobs;
+    INSERT INTO sources (name) SELECT DISTINCT source FROM jobs;
+
+    CREATE TABLE jobs_v2 (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        company_id INTEGER NOT NULL REFERENCES companies(id),
+        location_id INTEGER NOT NULL REFERENCES locations(id),
+        source_id INTEGER NOT NULL REFERENCES sources(id),
+        description BLOB,
+        url TEXT NOT NULL,
+        url_key TEXT NOT NULL,
+        posted_at INTEGER NOT NULL,
+        first_seen INTEGER NOT NULL,
+        last_seen INTEGER NOT NULL,
+        enriched_at INTEGER
+    );
+    ''')
+
+    # Rows from before first_seen existed count as first seen on their posting day
+    today = db.day_to_epoch(time.strftime('%Y-%m-%d', time.gmtime()))
+    conn.execute('''
+    INSERT INTO jobs_v2 (id, title, company_id, location_id, source_id, description, url, url_key,
+                         posted_at, first_seen, last_seen, enriched_at)
+    SELECT id, title, company_id, location_id, source_id, description, url, url_key,
+           posted_at, posted_at, posted_at, enriched_at
+    FROM (
+        SELECT jobs.id, jobs.title, companies.id AS company_id, locations.id AS location_id, sources.id AS source_id,
+               deflate(jobs.description) AS description, jobs.url, jobs.url_key,
+               COALESCE(CAST(strftime('%s', jobs.date_posted) AS INTEGER), ?) AS posted_at,
+               CAST(jobs.enriched_at AS INTEGER) AS enriched_at
+        FROM jobs
+        JOIN companies ON companies.name = jobs.company
+        JOIN locations ON locations.name = jobs.location
+        JOIN sources ON sources.name = jobs.source
+    )
+    ''', (today,))
+
+    run_script(conn, '''
+    DROP TABLE jobs;
+    ALTER TABLE jobs_v2 RENAME TO jobs;
+
+    CREATE UNIQUE INDEX idx_jobs_url_key ON jobs(url_key);
+    -- Listing indexes: newest-first pages, optionally narrowed to one source or company
+    CREATE INDEX idx_jobs_posted_at ON jobs(posted_at, id);
+    CREATE INDEX idx_jobs_source ON jobs(source_id, posted_at, id);
+    CREATE INDEX idx_jobs_company ON jobs(company_id, posted_at, id);
+
+    -- Full-text index over titles and descriptions, reading the decompressed text through a view
+    CREATE VIEW jobs_text AS SELECT id, title, inflate(description) AS description FROM jobs;
+    CREATE VIRTUAL TABLE jobs_fts USING fts5(
+        title, description, content='jobs_text', content_rowid='id', tokenize='porter unicode61'
+    );
+    CREATE TRIGGER jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, inflate(new.description));
+    END;
+    CREATE TRIGGER jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description) VALUES ('delete', old.id, old.title, inflate(old.description));
+    END;
+    CREATE TRIGGER jobs_fts_update AFTER UPDATE OF title, description ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description) VALUES ('delete', old.id, old.title, inflate(old.description));
+        INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, inflate(new.description));
+    END;
+    INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild');
+
+    -- Running counts per company, location, source and day, keyed by name as before
+    CREATE TRIGGER jobs_stats_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO job_stats(dimension, value, count)
+        SELECT 'company', name, 1 FROM companies WHERE id = new.company_id
+        UNION ALL SELECT 'location', name, 1 FROM locations WHERE id = new.location_id
+        UNION ALL SELECT 'source', name, 1 FROM sources WHERE id = new.source_id
+        UNION ALL SELECT 'day', date(new.posted_at, 'unixepoch'), 1 WHERE true
+        ON CONFLICT(dimension, value) DO UPDATE SET count = count + 1;
+    END;
+    CREATE TRIGGER jobs_stats_delete AFTER DELETE ON jobs BEGIN
+        UPDATE job_stats SET count = count - 1
+        WHERE dimension = 'company' AND value = (SELECT name FROM companies WHERE id = old.company_id);
+        UPDATE job_stats SET count = count - 1
+        WHERE dimension = 'location' AND value = (SELECT name FROM locations WHERE id = old.location_id);
+        UPDATE job_stats SET count = count - 1
+        WHERE dimension = 'source' AND value = (SELECT name FROM sources WHERE id = old.source_id);
+        UPDATE job_stats SET count = count - 1 WHERE dimension = 'day' AND value = date(old.posted_at, 'unixepoch');
+    END;
+    CREATE TRIGGER jobs_stats_update AFTER UPDATE OF company_id, location_id, source_id, posted_at ON jobs BEGIN
+        UPDATE job_stats SET count = count - 1
+        WHERE dimension = 'company' AND value = (SELECT name FROM companies WHERE id = old.company_id);
+        UPDATE job_stats SET count = count - 1
+        WHERE dimension = 'location' AND value = (SELECT name FROM locations WHERE id = old.location_id);
+        UPDATE job_stats SET count = count - 1
+        WHERE dimension = 'source' AND value = (SELECT name FROM sources WHERE id = old.source_id);
+        UPDATE job_stats SET count = count - 1 WHERE dimension = 'day' AND value = date(old.posted_at, 'unixepoch');
+        INSERT INTO job_stats(dimension, value, count)
+        SELECT 'company', name, 1 FROM companies WHERE id = new.company_id
+        UNION ALL SELECT 'location', name, 1 FROM locations WHERE id = new.location_id
+        UNION ALL SELECT 'source', name, 1 FROM sources WHERE id = new.source_id
+        UNION ALL SELECT 'day', date(new.posted_at, 'unixepoch'), 1 WHERE true
+        ON CONFLICT(dimension, value) DO UPDATE SET count = count + 1;
+    END;
+
+    -- Recount from the rebuilt table; title terms are unaffected
+    DELETE FROM job_stats WHERE dimension != 'title_term';
+    INSERT INTO job_stats(dimension, value, count)
+    SELECT 'company', companies.name, COUNT(*) FROM jobs JOIN companies ON companies.id = jobs.company_id GROUP BY companies.name;
+    INSERT INTO job_stats(dimension, value, count)
+    SELECT 'location', locations.name, COUNT(*) FROM jobs JOIN locations ON locations.id = jobs.location_id GROUP BY locations.name;
+    INSERT INTO job_stats(dimension, value, count)
+    SELECT 'source', sources.name, COUNT(*) FROM jobs JOIN sources ON sources.id = jobs.source_id GROUP BY sources.name;
+    INSERT INTO job_stats(dimension, value, count)
+    SELECT 'day', date(posted_at, 'unixepoch') AS day, COUNT(*) FROM jobs GROUP BY day;
+    ''')
+
+def _v3_clusters(conn):
+    # The same posting on several boards shares a canonical_id: the id of the
+    # first one stored. MinHash signatures and their LSH buckets let each
+    # insert find its duplicates without comparing against every row
+    run_script(conn, '''
+    ALTER TABLE jobs ADD COLUMN canonical_id INTEGER;
+    CREATE INDEX idx_jobs_canonical ON jobs(canonical_id);
+
+    CREATE TABLE job_signatures (
+        job_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL
+    );
+    CREATE TABLE job_lsh (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        job_id INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, job_id)
+    ) WITHOUT ROWID;
+    CREATE TRIGGER jobs_clusters_delete AFTER DELETE ON jobs BEGIN
+        DELETE FROM job_signatures WHERE job_id = old.id;
+        -- Scans job_lsh, which is keyed for lookups by bucket; jobs are rarely deleted
+        DELETE FROM job_lsh WHERE job_id = old.id;
+        UPDATE job_stats SET count = count - 1
+        WHERE dimension = 'unique' AND value = 'jobs' AND old.canonical_id = old.id;
+    END;
+    ''')
+
+    # Cluster the existing rows oldest first, as if they were arriving now
+    rows = conn.execute('''
+    SELECT jobs.id, jobs.title, companies.name, locations.name
+    FROM jobs
+    JOIN companies ON companies.id = jobs.company_id
+    JOIN locations ON locations.id = jobs.location_id
+    ORDER BY jobs.id
+    ''').fetchall()
+    db.assign_clusters(conn, [
+        {'id': row[0], 'title': row[1], 'company': row[2], 'location': row[3]} for row in rows
+    ])
+
+def _v4_details(conn):
+    # Skills, seniority and yearly salary range found by the local extractor,
+    # stored so skill filters and skill counts are plain SQL
+    run_script(conn, '''
+    ALTER TABLE jobs ADD COLUMN seniority TEXT;
+    ALTER TABLE jobs ADD COLUMN salary_min INTEGER;
+    ALTER TABLE jobs ADD COLUMN salary_max INTEGER;
+    CREATE INDEX idx_jobs_seniority ON jobs(seniority, posted_at, id);
+    CREATE INDEX idx_jobs_salary ON jobs(salary_max);
+
+    CREATE TABLE skills (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE COLLATE NOCASE);
+    CREATE TABLE job_skills (
+        skill_id INTEGER NOT NULL REFERENCES skills(id),
+        job_id INTEGER NOT NULL,
+        PRIMARY KEY (skill_id, job_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_job_skills_job ON job_skills(job_id, skill_id);
+
+    -- Running counts per skill and seniority level, next to the other dimensions
+    CREATE TRIGGER job_skills_stats_insert AFTER INSERT ON job_skills BEGIN
+        INSERT INTO job_stats(dimension, value, count)
+        SELECT 'skill', name, 1 FROM skills WHERE id = new.skill_id
+        ON CONFLICT(dimension, value) DO UPDATE SET count = count + 1;
+    END;
+    CREATE TRIGGER job_skills_stats_delete AFTER DELETE ON job_skills BEGIN
+        UPDATE job_stats SET count = count - 1
+        WHERE dimension = 'skill' AND value = (SELECT name FROM skills WHERE id = old.skill_id);
+    END;
+    CREATE TRIGGER jobs_seniority_insert AFTER INSERT ON jobs WHEN new.seniority IS NOT NULL BEGIN
+        INSERT INTO job_stats(dimension, value, count) VALUES ('seniority', new.seniority, 1)
+        ON CONFLICT(dimension, value) DO UPDATE SET count = count + 1;
+    END;
+    CREATE TRIGGER jobs_seniority_delete AFTER DELETE ON jobs BEGIN
+        UPDATE job_stats SET count = count - 1 WHERE dimension = 'seniority' AND value = old.seniority;
+        DELETE FROM job_skills WHERE job_id = old.id;
+    END;
+    CREATE TRIGGER jobs_seniority_update AFTER UPDATE OF seniority ON jobs BEGIN
+        UPDATE job_stats SET count = count - 1 WHERE dimension = 'seniority' AND value = old.seniority;
+        INSERT INTO job_stats(dimension, value, count) SELECT 'seniority', new.seniority, 1 WHERE new.seniority IS NOT NULL
+        ON CONFLICT(dimension, value) DO UPDATE SET count = count + 1;
+    END;
+    ''')
+
+    # Extract from the existing rows a batch at a time, so their descriptions are never all held at once
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            'SELECT id, title, inflate(description) FROM jobs WHERE id > ? ORDER BY id LIMIT 1000', (last_id,)
+        ).fetchall()
+        if not rows:
+            break
+        db.extract_details(conn, [{'id': row[0], 'title': row[1], 'description': row[2]} for row in rows])
+        last_id = rows[-1][0]
+
+def _v5_scrape_runs(conn):
+    # The jobs each scrape found, so clients can page through one run's results
+    # instead of receiving them all at once. Runs expire after a day
+    run_script(conn, '''
+    CREATE TABLE scrape_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at INTEGER NOT NULL
+    );
+    CREATE INDEX idx_scrape_runs_created ON scrape_runs(created_at);
+    CREATE TABLE scrape_run_jobs (
+        run_id INTEGER NOT NULL REFERENCES scrape_runs(id),
+        job_id INTEGER NOT NULL,
+        PRIMARY KEY (run_id, job_id)
+    ) WITHOUT ROWID;
+    ''')
+
+def _v6_caches(conn):
+    # Persistent caches of LLM results and of scraped result pages with the jobs parsed from them
+    run_script(conn, '''
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        key TEXT PRIMARY KEY,
+        result TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used);
+    CREATE TABLE IF NOT EXISTS http_cache (
+        url TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        body BLOB NOT NULL,
+        digest TEXT NOT NULL,
+        jobs BLOB,
+        cards_digest TEXT,
+        fetched_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_http_cache_last_used ON http_cache(last_used);
+    ''')
+
+# (version, migration) in the order they apply; append new ones, never edit applied ones
+MIGRATIONS = [
+    (1, _v1_baseline),
+    (2, _v2_normalize),
+    (3, _v3_clusters),
+    (4, _v4_details),
+    (5, _v5_scrape_runs),
+    (6, _v6_caches),
+]
+
+# Migrations that free enough pages to be worth compacting the file afterwards
+VACUUM_AFTER = {2}
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+# SQL functions the schema calls: the FTS view and triggers read descriptions
+# through inflate(), and migration 2 compresses them with deflate()
+REQUIRED_FUNCTIONS = ('deflate', 'inflate')
+
+def require_functions(conn):
+    """Raise RuntimeError unless `conn` has the functions the schema's views and triggers call
+
+    They are registered per connection by database.db.connect(); any other
+    connection (e.g. the sqlite3 shell) can read the tables, but fails on
+    writes to jobs and on full-text search.
+    """
+    missing = []
+    for name in REQUIRED_FUNCTIONS:
+        try:
+            conn.execute(f'SELECT {name}(NULL)')
+        except sqlite3.OperationalError:
+            missing.append(name)
+    if missing:
+        raise RuntimeError(
+            f"Connection lacks SQL functions {', '.join(missing)}(); open it with database.db.connect()"
+        )
+
+def migrate(conn, target=None):
+    """Apply every migration newer than the database's user_version, each in its own transaction
+
+    Stops after version `target` if given. `conn` must come from
+    database.db.connect() (see require_functions). Returns the versions
+    applied.
+    """
+    require_functions(conn)
+    isolation_level = conn.isolation_level
+    # Manage transactions explicitly so DDL and data changes commit together
+    conn.isolation_level = None
+    applied = []
+    try:
+        for version, migration in MIGRATIONS:
+            if version <= schema_version(conn):
+                continue
+            if target is not None and version > target:
+                break
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {version}')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            applied.append(version)
+        if VACUUM_AFTER.intersection(applied):
+            conn.execute('VACUUM')
+    finally:
+        conn.isolation_level = isolation_level
+    return applied
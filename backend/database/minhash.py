@@ -0,0 +1,87 @@
+# backend/database/minhash.py
+# MinHash signatures and LSH banding for spotting the same posting on several boards
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+# Hash functions per signature, split into bands of rows; two titles become candidates when any
+# band matches, which happens for almost every pair above 0.7 Jaccard and few below 0.3
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity of two titles at which the postings count as the same one
+DUPLICATE_THRESHOLD = 0.7
+
+_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+# Spellings the boards disagree on, mapped to one form
+_SYNONYMS = {
+    'sr': 'senior', 'snr': 'senior', 'jr': 'junior', 'eng': 'engineer', 'dev': 'developer',
+    'mgr': 'manager', 'ii': '2', 'iii': '3',
+}
+_TITLE_NOISE = {'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'}
+_COMPANY_NOISE = {'inc', 'llc', 'ltd', 'corp', 'corporation', 'co', 'company', 'gmbh', 'plc', 'limited', 'the'}
+
+def _tokens(text, noise=()):
+    if not text or text == 'N/A':
+        return []
+    words = (_SYNONYMS.get(word, word) for word in _TOKEN_RE.findall(text.lower()))
+    return [word for word in words if word not in noise]
+
+def block_key(job):
+    """Normalized company and city a duplicate must share, or None when the company is unknown
+
+    "Acme Inc." in "Austin, TX" and "ACME" in "Austin, Texas, United States"
+    both give "acme|austin".
+    """
+    company = _tokens(job['company'], _COMPANY_NOISE)
+    if not company:
+        return None
+    city = _tokens((job['location'] or '').split(',')[0])
+    return f"{' '.join(company)}|{' '.join(city)}"
+
+def shingles(job):
+    """Title words and adjacent word pairs, normalized, so "Sr. Python Dev" matches "Senior Python Developer" """
+    title = _tokens(job['title'], _TITLE_NOISE)
+    features = set(title)
+    features.update(f"{first} {second}" for first, second in zip(title, title[1:]))
+    return features
+
+def signature(features):
+    """MinHash signature of a feature set as NUM_PERM uint32 values, or None for an empty set"""
+    if not features:
+        return None
+    hashes = np.fromiter((zlib.crc32(f.encode('utf-8')) for f in features), dtype=np.uint64, count=len(features))
+    # (a * x + b) mod p for every hash function at once; rows are functions, columns features
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return (permuted.min(axis=1) & np.uint64(0xffffffff)).astype(np.uint32)
+
+def band_keys(sig, block):
+    """(band, bucket) pairs under which `sig` is filed, scoped to its block key
+
+    Buckets are signed 64-bit so they fit an SQLite INTEGER.
+    """
+    prefix = block.encode('utf-8')
+    rows = sig.reshape(BANDS, ROWS)
+    return [
+        (band, int.from_bytes(hashlib.blake2b(prefix + rows[band].tobytes(), digest_size=8).digest(), 'big', signed=True))
+        for band in range(BANDS)
+    ]
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the feature sets behind two signatures"""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+def to_blob(sig):
+    return sig.tobytes()
+
+def from_blob(blob):
+    return np.frombuffer(blob, dtype=np.uint32)
@@ -0,0 +1,160 @@
+# backend/scrapers/client.py
+import concurrent.futures
+import contextvars
+import email.utils
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrapers.throttle import HostThrottle
+from services import metrics
+
+# urllib3 only decodes brotli bodies when one of these packages is importable
+try:
+    import brotli  # noqa: F401
+    _HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _HAS_BROTLI = True
+    except ImportError:
+        _HAS_BROTLI = False
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Timeouts in seconds; connect is kept short so a dead host fails fast
+CONNECT_TIMEOUT = float(os.getenv("SCRAPE_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("SCRAPE_READ_TIMEOUT", "15"))
+
+# Retries on 429/5xx and connection errors, with full-jitter exponential backoff
+MAX_RETRIES = int(os.getenv("SCRAPE_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("SCRAPE_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("SCRAPE_BACKOFF_MAX", "8"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Keep-alive connections kept open per host
+POOL_SIZE = int(os.getenv("SCRAPE_POOL_SIZE", "10"))
+
+_session = None
+_session_lock = threading.Lock()
+
+# Shared by every thread fetching through this module, so each host sees one combined rate
+throttle = HostThrottle()
+
+def _host_states(field):
+    return lambda: {(host,): state[field] for host, state in throttle.snapshot().items()}
+
+metrics.gauge('scrape_host_rate', 'Requests per second the throttle currently allows each board host', ('host',), _host_states('rate'))
+metrics.gauge('scrape_host_paused_seconds', 'Seconds left of a Retry-After pause per host', ('host',), _host_states('paused_for'))
+metrics.gauge(
+    'scrape_host_open_seconds', 'Seconds until a host whose circuit tripped is tried again', ('host',), _host_states('open_for')
+)
+metrics.gauge('scrape_host_failures', 'Failed requests in a row per host', ('host',), _host_states('failures'))
+
+def get_session():
+    """Return the process-wide scraper session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def _build_session():
+    session = requests.Session()
+    # One pool per host inside the adapter; block instead of opening throwaway connections
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': 'gzip, deflate, br' if _HAS_BROTLI else 'gzip, deflate',
+        'Connection': 'keep-alive',
+    })
+    return session
+
+def get(url, background=False, **kwargs):
+    """GET `url` through the shared session, retrying 429/5xx and connection errors
+
+    Every attempt waits its turn on the host's throttle, which may raise
+    throttle.HostUnavailable while the host is cooling down; `background`
+    requests only use capacity interactive ones leave spare. Returns the
+    last response once retries are exhausted, so callers keep checking
+    `status_code` as before. Connection errors and timeouts are re-raised
+    after the final attempt.
+    """
+    kwargs.setdefault('timeout', (CONNECT_TIMEOUT, READ_TIMEOUT))
+    session = get_session()
+    host = urlsplit(url).netloc
+
+    attempt = 0
+    while True:
+        throttle.acquire(host, background=background)
+        try:
+            response = session.get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            throttle.record(host, None)
+            if attempt >= MAX_RETRIES:
+                raise
+            time.sleep(_backoff(attempt))
+            attempt += 1
+            continue
+
+        retry_after = _retry_after(response)
+        throttle.record(host, response.status_code, retry_after)
+        if response.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+            return response
+
+        # Release the connection back to the pool before waiting
+        response.close()
+        if retry_after is None:
+            time.sleep(_backoff(attempt))
+        # Otherwise the throttle pauses the whole host until Retry-After has passed
+        attempt += 1
+
+def _backoff(attempt):
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+def _retry_after(response):
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # HTTP-date form
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+# Background fetcher so the next results page downloads while the current one is parsed
+_prefetcher = concurrent.futures.ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix='prefetch')
+
+def iter_pages(urls, fetch=None):
+    """Yield a response for each of `urls` in order, keeping one page in flight ahead
+
+    `fetch(url)` replaces get() for each page, e.g. a caching fetcher. The
+    caller can stop iterating at any point; at most one extra page is
+    fetched and discarded.
+    """
+    fetch = fetch or get
+    urls = iter(urls)
+    url = next(urls, None)
+    future = _prefetch(fetch, url) if url is not None else None
+    while future is not None:
+        response = future.result()
+        url = next(urls, None)
+        future = _prefetch(fetch, url) if url is not None else None
+        yield response
+
+def _prefetch(fetch, url):
+    # Run in the caller's context so the fetch is timed against the request that wanted it
+    return _prefetcher.submit(contextvars.copy_context().run, fetch, url)
@@ -0,0 +1,198 @@
+# backend/scrapers/engine.py
+import datetime
+import itertools
+
+from scrapers import client, http_cache, parsing
+from scrapers.throttle import HostUnavailable
+from services import logs, metrics
+
+log = logs.get_logger(__name__)
+
+FETCH_SECONDS = metrics.histogram(
+    'scrape_fetch_seconds', 'Time to fetch one results page, including throttle waits and retries', ('source',)
+)
+PARSE_SECONDS = metrics.histogram('scrape_parse_seconds', 'Time to parse one results page into jobs', ('source',))
+CARDS_PER_PAGE = metrics.histogram(
+    'scrape_cards_per_page', 'Jobs parsed from one results page', ('source',), buckets=(0, 1, 5, 10, 15, 20, 30, 50, 100)
+)
+PAGES = metrics.counter('scrape_pages_total', 'Results pages fetched, by HTTP status', ('source', 'status'))
+ERRORS = metrics.counter('scrape_errors_total', 'Pages or cards that failed to scrape', ('source', 'stage'))
+
+class Field:
+    """Where one job field lives inside a result card
+
+    With `attr` unset the field is the element's stripped text, otherwise the
+    value of that attribute.
+    """
+    def __init__(self, tag, class_name, attr=None):
+        self.tag = tag
+        self.class_name = class_name
+        self.attr = attr
+
+class SourceSpec:
+    """Everything the engine needs to scrape one job board
+
+    page_url(base_url, job_title, location, page) builds the URL of a
+    zero-based results page, and normalize_url(base_url, href) turns the
+    scraped link into an absolute URL. `constants` fills fields the board
+    doesn't show on its result cards; for those, `detail` is the tag/class
+    pair holding the description on a posting's own page. `cache_ttl` is
+    how many seconds a fetched results page is reused before the board is
+    asked again.
+    """
+    def __init__(self, label, base_url, page_url, card, fields, normalize_url, constants=None, detail=None,
+                 cache_ttl=None):
+        self.label = label
+        self.base_url = base_url
+        self.page_url = page_url
+        self.fields = fields
+        self.normalize_url = normalize_url
+        self.constants = constants or {}
+        self.cache_ttl = http_cache.DEFAULT_PAGE_TTL if cache_ttl is None else cache_ttl
+
+        # Compiled once here: the card strainer for the tree builder, and a
+        # tag name -> [(field, class)] index for the single pass over each card
+        self.card = parsing.selector(*card)
+        self.detail = parsing.selector(*detail) if detail is not None else None
+        self.fields_by_tag = {}
+        for name, field in fields.items():
+            self.fields_by_tag.setdefault(field.tag, []).append((name, field.class_name))
+
+def scrape(spec, job_title, location, max_pages=1, is_known=None, take_page=None):
+    """Yield jobs from `spec`'s board page by page, stopping at the first empty page
+
+    With `is_known` given, paging also stops after the first page on which
+    every job is already known, since older results follow newer ones.
+    With `take_page` given, it is called just before each page is requested
+    and paging stops once it returns False, e.g. when a budget runs out.
+    Raises HostUnavailable when the board's host is cooling down.
+    """
+    pages = range(max_pages)
+    if take_page is not None:
+        pages = itertools.takewhile(lambda _: take_page(), pages)
+    page_urls = (spec.page_url(spec.base_url, job_title, location, page) for page in pages)
+    cache = http_cache.get_cache()
+    get = (lambda url: cache.fetch(url, spec.cache_ttl)) if cache is not None else client.get
+
+    def fetch(url):
+        with metrics.timer(FETCH_SECONDS, 'fetch', source=spec.label):
+            return get(url)
+
+    try:
+        # Next page downloads on the pooled session while this one is parsed
+        for response in client.iter_pages(page_urls, fetch=fetch):
+            PAGES.inc(source=spec.label, status=response.status_code)
+            if response.status_code != 200:
+                break
+
+            # An unchanged page comes back with the jobs parsed from it last time
+            jobs = response.jobs if cache is not None else None
+            if jobs is None:
+                with metrics.timer(PARSE_SECONDS, 'parse', source=spec.label):
+                    cards = parsing.parse_cards(response.text, spec.card)
+                    digest = http_cache.cards_digest(cards) if cache is not None else None
+                    # A new body around the same cards (a fresh nonce or timestamp) keeps the jobs too
+                    if digest is not None and digest == response.previous_digest:
+                        jobs = response.previous_jobs
+                    else:
+                        jobs = jobs_from_cards(spec, cards)
+                if cache is not None:
+                    cache.remember_jobs(response, digest, jobs)
+            if cache is not None:
+                # Posting dates are relative to when the page is seen, so reused jobs get today's
+                today = _today()
+                jobs = [dict(job, date_posted=today) for job in jobs]
+            CARDS_PER_PAGE.observe(len(jobs), source=spec.label)
+            if not jobs:
+                break
+
+            all_known = is_known is not None
+            for job in jobs:
+                all_known = all_known and is_known(job)
+                yield job
+            if all_known:
+                break
+
+    except HostUnavailable:
+        # Let the caller report the board as degraded rather than as merely empty
+        raise
+    except Exception as e:
+        ERRORS.inc(source=spec.label, stage='page')
+        log.error('scrape_failed', source=spec.label, error=str(e))
+
+def parse_page(spec, html):
+    """Parse every well-formed job card on a results page"""
+    return jobs_from_cards(spec, parsing.parse_cards(html, spec.card))
+
+def jobs_from_cards(spec, cards):
+    """Jobs from the well-formed cards among `cards`"""
+    date_posted = _today()
+    jobs = []
+    for card in cards:
+        job = parse_card(spec, card, date_posted)
+        if job is not None:
+            jobs.append(job)
+    return jobs
+
+def _today():
+    # Cards carry no posting date, so a job counts as posted on the day it is seen
+    return datetime.datetime.now().strftime("%Y-%m-%d")
+
+def scrape_detail(spec, url, background=False):
+    """Fetch a posting's own page and return its description, or None if it has none
+
+    Raises for failures worth retrying later: connection errors, HTTP
+    errors other than 404/410, and HostUnavailable. With `background` set
+    the fetch only uses throttle capacity that scrapes leave spare.
+    """
+    response = client.get(url, background=background)
+    if response.status_code in (404, 410):
+        return None
+    response.raise_for_status()
+    return parse_detail(spec, response.text)
+
+def parse_detail(spec, html):
+    found = parsing.parse_cards(html, spec.detail)
+    if not found:
+        return None
+    # Keep paragraph and list breaks so the LLM prompts stay readable
+    description = found[0].get_text(separator="\n", strip=True)
+    return description or None
+
+def parse_card(spec, card, date_posted):
+    """Extract one job from a result card in a single walk of its subtree
+
+    Returns None if the card is malformed.
+    """
+    try:
+        found = {}
+        remaining = len(spec.fields)
+        for elem in card.descendants:
+            # Text nodes have no name and never match
+            candidates = spec.fields_by_tag.get(elem.name)
+            if not candidates:
+                continue
+            classes = elem.get('class') or ()
+            for name, class_name in candidates:
+                if name not in found and class_name in classes:
+                    found[name] = elem
+                    remaining -= 1
+            if remaining == 0:
+                break
+
+        job = dict(spec.constants)
+        for name, field in spec.fields.items():
+            elem = found.get(name)
+            if field.attr is None:
+                job[name] = elem.get_text().strip() if elem is not None else "N/A"
+            else:
+                job[name] = elem.get(field.attr, "") if elem is not None else ""
+
+        job['url'] = spec.normalize_url(spec.base_url, job.get('url', ""))
+        job['source'] = spec.label
+        job['date_posted'] = date_posted
+        return job
+    except Exception as e:
+        ERRORS.inc(source=spec.label, stage='card')
+        log.warning('card_parse_failed', source=spec.label, error=str(e))
+        return None
@@ -0,0 +1,163 @@
+# backend/scrapers/http_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from database.db import DATABASE, connection
+from scrapers import client
+
+# Set SCRAPE_HTTP_CACHE=0 to always fetch result pages afresh
+HTTP_CACHE_ENABLED = os.getenv("SCRAPE_HTTP_CACHE", "1") != "0"
+
+# Seconds a result page is served without asking the board again, unless its spec says otherwise
+DEFAULT_PAGE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", "300"))
+
+# Result pages kept before the least recently used go
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "2000"))
+
+class CachedPage:
+    """A 200 result page, either fetched now or revalidated from the cache
+
+    `jobs` holds the jobs parsed from an identical body earlier, or None if
+    this body has not been parsed yet; then `previous_digest` and
+    `previous_jobs` are the card digest and jobs of the body cached before.
+    The body is decompressed on first use of `text`, so pages answered from
+    `jobs` never pay for it.
+    """
+    status_code = 200
+
+    def __init__(self, url, digest, text=None, body=None, jobs=None, previous_digest=None, previous_jobs=None):
+        self.url = url
+        self.digest = digest
+        self.jobs = jobs
+        self.previous_digest = previous_digest
+        self.previous_jobs = previous_jobs
+        self._text = text
+        self._body = body
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = zlib.decompress(self._body).decode('utf-8')
+        return self._text
+
+class PageCache:
+    """On-disk cache of scraped result pages in the http_cache table of a migrated jobs database
+
+    Stores each page's compressed body with its ETag/Last-Modified, and the
+    jobs parsed from it with a digest of its job cards. Within a page's TTL
+    no request is sent; after it, the board is asked conditionally, and a
+    304 or a byte-identical body reuses the parsed jobs outright.
+    """
+    def __init__(self, path=DATABASE, max_entries=HTTP_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+
+    @staticmethod
+    def digest(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def fetch(self, url, ttl=DEFAULT_PAGE_TTL):
+        """GET `url`, answering from the cache while fresh and revalidating it once stale
+
+        Returns a CachedPage for 200 and 304 answers, and the plain response
+        for anything else.
+        """
+        now = time.time()
+        with connection(self.path) as conn:
+            row = conn.execute(
+                'SELECT etag, last_modified, body, digest, jobs, fetched_at, cards_digest FROM http_cache WHERE url = ?',
+                (url,)
+            ).fetchone()
+
+        if row is not None and now - row[5] < ttl:
+            self._touch(url, now)
+            return self._page(url, row)
+
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers['If-None-Match'] = row[0]
+            if row[1]:
+                headers['If-Modified-Since'] = row[1]
+        response = client.get(url, headers=headers)
+
+        if response.status_code == 304 and row is not None:
+            self._touch(url, now, fetched=True)
+            return self._page(url, row)
+        if response.status_code != 200:
+            return response
+
+        text = response.text
+        digest = self.digest(text)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if row is not None and row[3] == digest:
+            # Same bytes without validators matching (e.g. the board ignores them); keep the parsed jobs
+            with connection(self.path) as conn, conn:
+                conn.execute(
+                    'UPDATE http_cache SET etag = ?, last_modified = ?, fetched_at = ?, last_used = ? WHERE url = ?',
+                    (etag, last_modified, now, now, url)
+                )
+            return CachedPage(url, digest, text=text, jobs=self._jobs(row[4]))
+
+        with connection(self.path) as conn, conn:
+            conn.execute(
+                '''
+                INSERT OR REPLACE INTO http_cache
+                    (url, etag, last_modified, body, digest, jobs, cards_digest, fetched_at, last_used)
+                VALUES (?, ?, ?, ?, ?, NULL, NULL, ?, ?)
+                ''',
+                (url, etag, last_modified, zlib.compress(text.encode('utf-8')), digest, now, now)
+            )
+            conn.execute(
+                'DELETE FROM http_cache WHERE url IN (SELECT url FROM http_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+        if row is None:
+            return CachedPage(url, digest, text=text)
+        return CachedPage(url, digest, text=text, previous_digest=row[6], previous_jobs=self._jobs(row[4]))
+
+    def remember_jobs(self, page, cards_digest, jobs):
+        """Store the jobs parsed from `page` and the digest of its cards, as long as the cached body is still the one parsed"""
+        blob = zlib.compress(json.dumps(jobs).encode('utf-8'))
+        with connection(self.path) as conn, conn:
+            conn.execute(
+                'UPDATE http_cache SET jobs = ?, cards_digest = ? WHERE url = ? AND digest = ?',
+                (blob, cards_digest, page.url, page.digest)
+            )
+
+    def _page(self, url, row):
+        return CachedPage(url, row[3], body=row[2], jobs=self._jobs(row[4]))
+
+    @staticmethod
+    def _jobs(blob):
+        return json.loads(zlib.decompress(blob)) if blob is not None else None
+
+    def _touch(self, url, now, fetched=False):
+        with connection(self.path) as conn, conn:
+            if fetched:
+                conn.execute('UPDATE http_cache SET fetched_at = ?, last_used = ? WHERE url = ?', (now, now, url))
+            else:
+                conn.execute('UPDATE http_cache SET last_used = ? WHERE url = ?', (now, url))
+
+def cards_digest(cards):
+    """Digest of a page's job cards, unaffected by nonces, tokens or timestamps elsewhere on the page"""
+    return hashlib.sha256('\n'.join(map(str, cards)).encode('utf-8')).hexdigest()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the process-wide page cache, or None when SCRAPE_HTTP_CACHE=0"""
+    global _cache
+    if not HTTP_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PageCache()
+    return _cache
@@ -0,0 +1,139 @@
+# backend/scrapers/orchestrator.py
+import concurrent.futures
+import contextvars
+import functools
+import os
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+from scrapers import client, engine
+from scrapers.sources import SPECS
+from scrapers.throttle import HostUnavailable
+from services import logs, metrics
+
+log = logs.get_logger(__name__)
+
+SOURCE_SECONDS = metrics.histogram(
+    'scrape_source_seconds', 'Time from starting a source to its outcome within one search', ('source', 'outcome')
+)
+
+# Job boards available to /api/scrape, keyed by the names the API accepts
+SCRAPERS = {name: functools.partial(engine.scrape, spec) for name, spec in SPECS.items()}
+
+# Seconds to wait for each source before giving up on it
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "30"))
+
+# Result pages walked per source when the caller doesn't say, and the hard cap
+DEFAULT_MAX_PAGES = int(os.getenv("SCRAPE_MAX_PAGES", "3"))
+MAX_PAGES_LIMIT = int(os.getenv("SCRAPE_MAX_PAGES_LIMIT", "10"))
+
+# Jobs buffered between the scraper workers and the consumer; workers wait when it is full
+QUEUE_SIZE = 200
+
+# Shared pool so a hung board only ties up its own worker, never the request thread
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix='scraper')
+
+def stream_scrapers(job_title, location, sources, status, max_pages=1, timeout=None, heartbeat=None):
+    """Yield jobs from the selected scrapers as soon as any of them parses a card
+
+    `status` is filled in place with each source's outcome ('running', then
+    'ok', 'timeout', 'error' or 'degraded'), job count and elapsed seconds.
+    A degraded source was cut off by its host's circuit breaker; its status
+    also says in how many seconds it will be tried again. Jobs a source
+    produced before timing out are kept. With `heartbeat` set, None is yielded
+    whenever that many seconds pass without a new job, so consumers can flush
+    what they have while the boards are between pages.
+    """
+    if timeout is None:
+        timeout = SCRAPE_TIMEOUT
+
+    started = time.perf_counter()
+    deadline = started + timeout
+    results = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+
+    pending = set()
+    for source in sources:
+        scraper = SCRAPERS.get(source)
+        if scraper is None:
+            continue
+        status[source] = {'status': 'running', 'count': 0, 'elapsed': None}
+        # The worker inherits the request's context so its fetch and parse times are reported with it
+        _executor.submit(
+            contextvars.copy_context().run, _drain, source, scraper, job_title, location, max_pages, results, stop
+        )
+        pending.add(source)
+
+    # Every source starts at the same time, so one deadline is a per-source timeout
+    try:
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                kind, source, payload = results.get(timeout=min(remaining, heartbeat or remaining))
+            except queue.Empty:
+                if heartbeat and time.perf_counter() < deadline:
+                    yield None
+                    continue
+                break
+
+            if kind == 'job':
+                status[source]['count'] += 1
+                yield payload
+                continue
+
+            pending.discard(source)
+            retry_in = client.throttle.retry_in(urlsplit(SPECS[source].base_url).netloc)
+            if kind == 'degraded' or retry_in > 0:
+                kind = 'degraded'
+                status[source]['retry_in'] = round(retry_in, 1)
+            status[source]['status'] = kind
+            status[source]['elapsed'] = round(payload, 3)
+            SOURCE_SECONDS.observe(payload, source=SPECS[source].label, outcome=kind)
+    finally:
+        # Tell the workers to stop; their late results are simply discarded
+        stop.set()
+        for source in pending:
+            elapsed = time.perf_counter() - started
+            status[source]['status'] = 'timeout'
+            status[source]['elapsed'] = round(elapsed, 3)
+            SOURCE_SECONDS.observe(elapsed, source=SPECS[source].label, outcome='timeout')
+            log.warning('source_timed_out', source=source, elapsed=round(elapsed, 3))
+
+def run_scrapers(job_title, location, sources, max_pages=1, timeout=None):
+    """Run the selected scrapers concurrently and keep whatever finishes in time
+
+    Returns (jobs, status) where status maps each source to its outcome
+    ('ok', 'timeout', 'error' or 'degraded'), job count and elapsed seconds.
+    """
+    status = {}
+    jobs = list(stream_scrapers(job_title, location, sources, status, max_pages=max_pages, timeout=timeout))
+    return jobs, status
+
+def _drain(source, scraper, job_title, location, max_pages, results, stop):
+    started = time.perf_counter()
+    outcome = 'ok'
+    try:
+        for job in scraper(job_title, location, max_pages=max_pages):
+            if not _put(results, ('job', source, job), stop):
+                return
+    except HostUnavailable as e:
+        log.warning('source_degraded', source=source, error=str(e))
+        outcome = 'degraded'
+    except Exception as e:
+        log.error('source_failed', source=source, error=str(e))
+        outcome = 'error'
+    _put(results, (outcome, source, time.perf_counter() - started), stop)
+
+def _put(results, item, stop):
+    # Wait for room in the queue, but give up once the consumer has gone away
+    while not stop.is_set():
+        try:
+            results.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
@@ -0,0 +1,30 @@
+# backend/scrapers/parsing.py
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml builds trees several times faster than the pure-Python parser; use it when installed
+try:
+    import lxml  # noqa: F401
+    _DEFAULT_PARSER = 'lxml'
+except ImportError:
+    _DEFAULT_PARSER = 'html.parser'
+
+# Tree builder handed to BeautifulSoup, e.g. SCRAPE_HTML_PARSER=html.parser to force the stdlib one
+HTML_PARSER = os.getenv("SCRAPE_HTML_PARSER", _DEFAULT_PARSER)
+
+def selector(tag, class_name):
+    """Compile a tag/class pair once so per-card lookups don't rebuild the matcher"""
+    # While parsing, a strainer sees the raw class attribute ("base-card relative ...")
+    # rather than the split list, so match the class as a whole word
+    return SoupStrainer(tag, class_=re.compile(rf"(?:^|\s){re.escape(class_name)}(?:\s|$)"))
+
+def parse_cards(html, card, parser=None):
+    """Return the elements matching the `card` selector, skipping the rest of the page
+
+    Only the card subtrees are turned into Tag objects; headers, scripts and
+    navigation are discarded by the tree builder.
+    """
+    soup = BeautifulSoup(html, parser or HTML_PARSER, parse_only=card)
+    return soup.find_all(card)
@@ -0,0 +1,90 @@
+# backend/scrapers/sources.py
+# One spec per job board; selectors may need updating as the boards change their HTML
+from scrapers.engine import Field, SourceSpec
+
+# Shown for boards whose result cards carry no description
+NO_DESCRIPTION = "Click to view full description"
+
+def join_base(base_url, href):
+    # Relative links on the board's own domain
+    return f"{base_url}{href}" if href else "N/A"
+
+def as_is(base_url, href):
+    # Links that are already absolute
+    return href or "N/A"
+
+def indeed_page_url(base_url, job_title, location, page):
+    query = f"{job_title.replace(' ', '+')}+in+{location.replace(' ', '+')}"
+    url = f"{base_url}/jobs?q={query}"
+    # Indeed offsets result pages with &start=, ten cards at a time
+    return url if page == 0 else f"{url}&start={page * 10}"
+
+def linkedin_page_url(base_url, job_title, location, page):
+    query = f"{job_title.replace(' ', '%20')}%20{location.replace(' ', '%20')}"
+    url = f"{base_url}/jobs/search/?keywords={query}"
+    # LinkedIn offsets result pages with &start=, twenty-five cards at a time
+    return url if page == 0 else f"{url}&start={page * 25}"
+
+def glassdoor_page_url(base_url, job_title, location, page):
+    query = f"{job_title.replace(' ', '-')}-jobs-in-{location.replace(' ', '-')}"
+    url = f"{base_url}/Job/{query}-SRCH_KO0,{len(job_title)}_IL.0,{len(location)}_IN1"
+    # Glassdoor numbers result pages with an _IP<n> suffix from page two onwards
+    return f"{url}.htm" if page == 0 else f"{url}_IP{page + 1}.htm"
+
+INDEED = SourceSpec(
+    label='Indeed',
+    base_url="https://www.indeed.com",
+    page_url=indeed_page_url,
+    card=('div', 'job_seen_beacon'),
+    fields={
+        'title': Field('h2', 'jobTitle'),
+        'company': Field('span', 'companyName'),
+        'location': Field('div', 'companyLocation'),
+        'description': Field('div', 'job-snippet'),
+        'url': Field('a', 'jcs-JobTitle', attr='href'),
+    },
+    normalize_url=join_base,
+)
+
+LINKEDIN = SourceSpec(
+    label='LinkedIn',
+    base_url="https://www.linkedin.com",
+    page_url=linkedin_page_url,
+    card=('div', 'base-card'),
+    fields={
+        'title': Field('h3', 'base-search-card__title'),
+        'company': Field('h4', 'base-search-card__subtitle'),
+        'location': Field('span', 'job-search-card__location'),
+        'url': Field('a', 'base-card__full-link', attr='href'),
+    },
+    normalize_url=as_is,
+    constants={'description': NO_DESCRIPTION},
+    detail=('div', 'show-more-less-html__markup'),
+)
+
+GLASSDOOR = SourceSpec(
+    label='Glassdoor',
+    base_url="https://www.glassdoor.com",
+    page_url=glassdoor_page_url,
+    card=('li', 'react-job-listing'),
+    fields={
+        'title': Field('a', 'job-link'),
+        'company': Field('div', 'job-search-results__company-name'),
+        'location': Field('span', 'location'),
+        # The title link doubles as the job link
+        'url': Field('a', 'job-link', attr='href'),
+    },
+    normalize_url=join_base,
+    constants={'description': NO_DESCRIPTION},
+    detail=('div', 'jobDescriptionContent'),
+)
+
+# Keyed by the names /api/scrape accepts
+SPECS = {
+    'indeed': INDEED,
+    'linkedin': LINKEDIN,
+    'glassdoor': GLASSDOOR,
+}
+
+# Keyed by the label stored in each job's source column
+SPECS_BY_LABEL = {spec.label: spec for spec in SPECS.values()}
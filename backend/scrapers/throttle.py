@@ -0,0 +1,153 @@
+# backend/scrapers/throttle.py
+import os
+import threading
+import time
+
+# Requests per second each host starts at, the bounds adaptation keeps it within,
+# and how many requests may go out back to back after an idle spell
+HOST_RATE = float(os.getenv("SCRAPE_HOST_RATE", "2"))
+HOST_MIN_RATE = float(os.getenv("SCRAPE_HOST_MIN_RATE", "0.1"))
+HOST_MAX_RATE = float(os.getenv("SCRAPE_HOST_MAX_RATE", "10"))
+HOST_BURST = float(os.getenv("SCRAPE_HOST_BURST", "5"))
+
+# AIMD: a 429/403/503 multiplies the rate by RATE_DECREASE, each success adds RATE_INCREASE
+RATE_DECREASE = 0.5
+RATE_INCREASE = 0.1
+
+# Failures in a row that open a host's circuit, and seconds it stays open
+BREAKER_THRESHOLD = int(os.getenv("SCRAPE_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("SCRAPE_BREAKER_COOLDOWN", "120"))
+
+# Longest a request waits for its host before giving up on it
+MAX_WAIT = float(os.getenv("SCRAPE_THROTTLE_MAX_WAIT", "30"))
+
+# Tokens a background request (e.g. a detail-page fetch) must leave in the bucket, so it only
+# uses capacity interactive scrapes aren't using, and how often it checks for some
+BACKGROUND_RESERVE = float(os.getenv("SCRAPE_BACKGROUND_RESERVE", "2"))
+BACKGROUND_POLL = 0.5
+
+# Answers meaning "slow down": the rate is cut and the host paused
+SLOW_DOWN_STATUSES = {403, 429, 503}
+
+class HostUnavailable(Exception):
+    """Raised instead of sending a request to a host that is cooling down
+
+    `retry_in` is the number of seconds until the host is tried again.
+    """
+    def __init__(self, host, retry_in):
+        super().__init__(f"{host} unavailable for another {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+class _HostState:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+
+class HostThrottle:
+    """Per-host token bucket with an AIMD rate and a circuit breaker; safe to share between threads"""
+    def __init__(self, rate=HOST_RATE, burst=HOST_BURST, min_rate=HOST_MIN_RATE, max_rate=HOST_MAX_RATE,
+                 threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN, max_wait=MAX_WAIT):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        # Caller holds the lock
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.rate, self.burst)
+        return state
+
+    def acquire(self, host, background=False):
+        """Wait for a token for `host`, raising HostUnavailable if the wait would be too long"""
+        if background:
+            self._acquire_spare(host)
+            return
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            if state.open_until > now:
+                raise HostUnavailable(host, state.open_until - now)
+
+            state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            # Take the token now, even into debt, so concurrent callers queue up in order
+            wait = max(state.paused_until - now, (1 - state.tokens) / state.rate, 0.0)
+            if wait > self.max_wait:
+                raise HostUnavailable(host, wait)
+            state.tokens -= 1
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def _acquire_spare(self, host):
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            with self._lock:
+                state = self._state(host)
+                now = time.monotonic()
+                if state.open_until > now:
+                    raise HostUnavailable(host, state.open_until - now)
+                state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+                state.updated = now
+                # A bucket too small for the reserve still lets background requests through when full
+                if state.paused_until <= now and state.tokens >= 1 + min(BACKGROUND_RESERVE, self.burst - 1):
+                    state.tokens -= 1
+                    return
+            if now >= deadline:
+                raise HostUnavailable(host, BACKGROUND_POLL)
+            time.sleep(min(BACKGROUND_POLL, deadline - now))
+
+    def record(self, host, status_code, retry_after=None):
+        """Feed back the answer to a request; None for a connection error or timeout"""
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            if status_code is not None and status_code < 500 and status_code not in SLOW_DOWN_STATUSES:
+                state.failures = 0
+                state.rate = min(self.max_rate, state.rate + RATE_INCREASE)
+                return
+
+            if status_code in SLOW_DOWN_STATUSES:
+                state.rate = max(self.min_rate, state.rate * RATE_DECREASE)
+                pause = retry_after if retry_after is not None else 1 / state.rate
+                state.paused_until = max(state.paused_until, now + pause)
+
+            state.failures += 1
+            if state.failures >= self.threshold:
+                state.open_until = now + self.cooldown
+                # Half-open afterwards: one more failure closes the door again
+                state.failures = self.threshold - 1
+
+    def retry_in(self, host):
+        """Seconds until `host` takes requests again; 0 if it is not cooling down"""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                return 0.0
+            return max(state.open_until - time.monotonic(), 0.0)
+
+    def snapshot(self):
+        """Current rate, pause and circuit state of every host seen so far"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    'rate': round(state.rate, 3),
+                    'paused_for': round(max(state.paused_until - now, 0.0), 1),
+                    'open_for': round(max(state.open_until - now, 0.0), 1),
+                    'failures': state.failures,
+                }
+                for host, state in self._hosts.items()
+            }
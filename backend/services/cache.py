@@ -0,0 +1,90 @@
+# backend/services/cache.py
+import hashlib
+import os
+import threading
+import time
+
+from database.db import DATABASE, connection
+
+# Seconds a cached result stays valid, and how many results are kept before the least recently used go
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+class ResultCache:
+    """Persistent cache of LLM results in the llm_cache table of a migrated jobs database
+
+    Entries are keyed by operation, model, prompt version and a hash of the
+    input text, so identical descriptions share one entry whichever board
+    they came from, and changing a prompt invalidates only its own results.
+    """
+    def __init__(self, path=DATABASE, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(operation, model, prompt_version, text):
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{operation}:{model}:{prompt_version}:{digest}"
+
+    def get(self, key):
+        """Return the cached result for `key`, or None if missing or expired"""
+        now = time.time()
+        with connection(self.path) as conn, conn:
+            row = conn.execute('SELECT result, created_at FROM llm_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                return None
+            conn.execute('UPDATE llm_cache SET last_used = ? WHERE key = ?', (now, key))
+            return row[0]
+
+    def set(self, key, result):
+        """Store `result`, then drop expired entries and the least recently used beyond max_entries"""
+        now = time.time()
+        with connection(self.path) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, result, created_at, last_used) VALUES (?, ?, ?, ?)',
+                (key, result, now, now)
+            )
+            conn.execute('DELETE FROM llm_cache WHERE created_at < ?', (now - self.ttl,))
+            conn.execute(
+                'DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def get_or_compute(self, key, compute):
+        """Return the cached result for `key`, calling `compute()` and caching its result on a miss"""
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.set(key, result)
+        return result
+
+class MemoryCache:
+    """Short-lived in-process cache for results that are cheap to lose, e.g. aggregate queries
+
+    Entries expire `ttl` seconds after they were computed; beyond
+    `max_entries` the oldest go first.
+    """
+    def __init__(self, ttl, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                return entry[1]
+        # Computed outside the lock; two concurrent misses may both compute, which is harmless
+        result = compute()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now, result)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        return result
@@ -0,0 +1,144 @@
+# backend/services/crawler.py
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from database.db import (
+    connection, due_searches, schedule_search, upsert_jobs, jobs_by_keys, job_key,
+    link_search_jobs, is_known_job
+)
+from scrapers import engine
+from scrapers.sources import SPECS
+from scrapers.throttle import HostUnavailable
+from services import logs
+
+log = logs.get_logger(__name__)
+
+# Seconds between checks for due searches, and the default re-crawl interval of a saved search
+CRAWL_POLL_INTERVAL = float(os.getenv("CRAWL_POLL_INTERVAL", "30"))
+CRAWL_DEFAULT_INTERVAL = int(os.getenv("CRAWL_DEFAULT_INTERVAL", "3600"))
+
+# Shortest re-crawl interval a saved search may ask for
+CRAWL_MIN_INTERVAL = int(os.getenv("CRAWL_MIN_INTERVAL", "300"))
+
+# Result pages fetched per source per crawl, and the pages each host may serve us per hour
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "5"))
+CRAWL_PAGES_PER_HOUR = float(os.getenv("CRAWL_PAGES_PER_HOUR", "120"))
+
+# Seconds before retrying a search whose hosts had no budget left or were cooling down
+CRAWL_RETRY_DELAY = 300
+
+# Jobs upserted per transaction during a crawl
+CRAWL_BATCH_SIZE = 20
+
+class HostBudget:
+    """Token bucket of result pages per host, refilled continuously up to one hour's allowance"""
+    def __init__(self, pages_per_hour=CRAWL_PAGES_PER_HOUR):
+        self.capacity = pages_per_hour
+        self.rate = pages_per_hour / 3600.0
+        self._tokens = {}
+        self._updated = {}
+
+    def available(self, host, now):
+        """Whole pages `host` could serve right now"""
+        return int(self._refill(host, now))
+
+    def take(self, host, wanted, now):
+        """Reserve up to `wanted` pages for `host` and return how many were granted"""
+        tokens = self._refill(host, now)
+        granted = min(wanted, int(tokens))
+        self._tokens[host] = tokens - granted
+        self._updated[host] = now
+        return granted
+
+    def _refill(self, host, now):
+        tokens = self._tokens.get(host, self.capacity)
+        elapsed = now - self._updated.get(host, now)
+        return min(self.capacity, tokens + elapsed * self.rate)
+
+class Crawler:
+    """Background thread re-crawling saved searches when they fall due
+
+    Each crawl walks result pages newest-first and stops a source as soon as
+    a whole page is already stored, so steady-state crawls cost a page or
+    two. `on_stored` is called with every batch of stored jobs.
+    """
+    def __init__(self, on_stored=None, budget=None):
+        self.on_stored = on_stored
+        self.budget = budget or HostBudget()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='crawler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_due()
+            except Exception as e:
+                log.error('crawl_failed', error=str(e))
+            self._stop.wait(CRAWL_POLL_INTERVAL)
+
+    def run_due(self):
+        """Crawl every saved search that is due now, one at a time"""
+        with connection() as conn:
+            for search in due_searches(conn, time.time()):
+                if self._stop.is_set():
+                    break
+                self.crawl(conn, search)
+
+    def crawl(self, conn, search):
+        now = time.time()
+        plan = {}
+        for source in search['sources']:
+            spec = SPECS.get(source)
+            if spec is None:
+                continue
+            host = urlsplit(spec.base_url).netloc
+            if self.budget.available(host, now):
+                plan[source] = host
+
+        if not plan:
+            # Every host is out of budget; look again later instead of skipping the crawl
+            schedule_search(conn, search['id'], now + CRAWL_RETRY_DELAY)
+            return
+
+        degraded = False
+        for source, host in plan.items():
+            # Pages are paid for one at a time as they are requested, so an early stop costs only what was fetched
+            jobs = engine.scrape(
+                SPECS[source], search['job_title'], search['location'],
+                max_pages=CRAWL_MAX_PAGES, is_known=lambda job: is_known_job(conn, job),
+                take_page=lambda host=host: self.budget.take(host, 1, time.time()) == 1
+            )
+            batch = []
+            try:
+                for job in jobs:
+                    batch.append(job)
+                    if len(batch) >= CRAWL_BATCH_SIZE:
+                        self._store(conn, search['id'], batch)
+                        batch = []
+            except HostUnavailable as e:
+                log.warning('crawl_source_degraded', source=source, error=str(e))
+                degraded = True
+            if batch:
+                self._store(conn, search['id'], batch)
+
+        # A board that was cooling down is tried again sooner than the usual interval
+        finished = time.time()
+        interval = min(search['interval_seconds'], CRAWL_RETRY_DELAY) if degraded else search['interval_seconds']
+        schedule_search(conn, search['id'], finished + interval, crawled_at=finished)
+
+    def _store(self, conn, search_id, batch):
+        upsert_jobs(conn, batch)
+        stored = jobs_by_keys(conn, set(map(job_key, batch)))
+        link_search_jobs(conn, search_id, [job['id'] for job in stored])
+        if self.on_stored is not None:
+            self.on_stored(stored)
@@ -0,0 +1,196 @@
+# backend/services/embeddings.py
+import math
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from services import logs
+
+log = logs.get_logger(__name__)
+
+# Width of the hashed term space; rows only store their non-zero buckets, so a wide
+# space costs nothing per job and keeps collisions rare
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", str(2 ** 18)))
+
+# Jobs embedded per step when adding, so the lock is never held for a whole table
+_BATCH_ROWS = 1000
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+def job_text(job):
+    # The title says more about a posting than any one sentence of its description
+    return f"{job['title']} {job['title']} {job.get('company', '')} {job.get('description') or ''}"
+
+def embed(text, dim=EMBEDDING_DIM):
+    """Sublinear term-frequency vector of `text`, hashed into `dim` buckets and L2-normalized
+
+    Returns the non-zero entries as (buckets, weights) arrays, buckets ascending.
+    """
+    counts = {}
+    for token in tokenize(text):
+        bucket = zlib.crc32(token.encode('utf-8')) % dim
+        counts[bucket] = counts.get(bucket, 0) + 1
+
+    buckets = np.array(sorted(counts), dtype=np.int32)
+    weights = np.array([1.0 + math.log(counts[bucket]) for bucket in buckets.tolist()], dtype=np.float32)
+    norm = np.linalg.norm(weights)
+    if norm > 0:
+        weights /= norm
+    return buckets, weights
+
+class JobIndex:
+    """In-memory TF-IDF index over stored jobs, held as sparse rows in flat NumPy arrays"""
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+        # Entries of every row, contiguous per row: bucket, weight and owning row
+        self._buckets = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        self._entry_rows = np.zeros(0, dtype=np.int32)
+        self._entries = 0
+        self._retired = 0
+        # Per row: job id (-1 once retired), first entry and entry count
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._starts = np.zeros(0, dtype=np.int64)
+        self._lengths = np.zeros(0, dtype=np.int32)
+        self._rows = 0
+        self._row_of = {}
+        self._df = np.zeros(dim, dtype=np.float64)
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._loaded.set()
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def load_in_background(self, load):
+        """Run `load(self)` on a daemon thread, e.g. to add every stored job; search() waits until it returns"""
+        self._loaded.clear()
+
+        def run():
+            try:
+                load(self)
+            except Exception as e:
+                log.error('job_index_load_failed', error=str(e))
+            finally:
+                self._loaded.set()
+                log.info('job_index_loaded', jobs=len(self))
+
+        threading.Thread(target=run, name='job-index', daemon=True).start()
+
+    def add_many(self, jobs, replace=True):
+        """Add or re-embed jobs given as dicts with id, title, company and description
+
+        With `replace` false, jobs already in the index are left as they are,
+        so a bulk load never overwrites a newer version added meanwhile.
+        """
+        batch = []
+        for job in jobs:
+            batch.append(job)
+            if len(batch) >= _BATCH_ROWS:
+                self._add(batch, replace)
+                batch = []
+        if batch:
+            self._add(batch, replace)
+
+    def _add(self, jobs, replace):
+        vectors = [(job['id'], embed(job_text(job), self.dim)) for job in jobs]
+        with self._lock:
+            for job_id, (buckets, weights) in vectors:
+                row = self._row_of.get(job_id)
+                if row is not None:
+                    if not replace:
+                        continue
+                    self._retire(row)
+                self._append(job_id, buckets, weights)
+            if self._retired * 2 > self._entries:
+                self._compact()
+
+    def _retire(self, row):
+        start, length = self._starts[row], self._lengths[row]
+        self._df[self._buckets[start:start + length]] -= 1
+        self._ids[row] = -1
+        self._retired += int(length)
+
+    def _append(self, job_id, buckets, weights):
+        if self._rows == len(self._ids):
+            self._grow_rows()
+        while self._entries + len(buckets) > len(self._buckets):
+            self._grow_entries()
+        row, start, end = self._rows, self._entries, self._entries + len(buckets)
+        self._buckets[start:end] = buckets
+        self._weights[start:end] = weights
+        self._entry_rows[start:end] = row
+        self._ids[row] = job_id
+        self._starts[row] = start
+        self._lengths[row] = len(buckets)
+        self._row_of[job_id] = row
+        self._rows += 1
+        self._entries = end
+        self._df[buckets] += 1
+
+    # Capacities double so appends stay amortized O(1)
+    def _grow_rows(self):
+        capacity = max(1024, 2 * len(self._ids))
+        self._ids = _resized(self._ids, capacity)
+        self._starts = _resized(self._starts, capacity)
+        self._lengths = _resized(self._lengths, capacity)
+
+    def _grow_entries(self):
+        capacity = max(65536, 2 * len(self._buckets))
+        self._buckets = _resized(self._buckets, capacity)
+        self._weights = _resized(self._weights, capacity)
+        self._entry_rows = _resized(self._entry_rows, capacity)
+
+    def _compact(self):
+        live = np.flatnonzero(self._ids[:self._rows] >= 0)
+        keep = self._ids[self._entry_rows[:self._entries]] >= 0
+        new_row = np.full(self._rows, -1, dtype=np.int32)
+        new_row[live] = np.arange(len(live), dtype=np.int32)
+
+        self._buckets = self._buckets[:self._entries][keep]
+        self._weights = self._weights[:self._entries][keep]
+        self._entry_rows = new_row[self._entry_rows[:self._entries][keep]]
+        self._entries = len(self._buckets)
+        self._retired = 0
+
+        self._ids = self._ids[live]
+        self._lengths = self._lengths[live]
+        self._starts = np.zeros(len(live), dtype=np.int64)
+        np.cumsum(self._lengths[:-1], out=self._starts[1:])
+        self._rows = len(live)
+        self._row_of = {int(job_id): row for row, job_id in enumerate(self._ids.tolist())}
+
+    def search(self, text, k=20):
+        """Return up to `k` (job_id, similarity) pairs most similar to `text`, best first"""
+        buckets, weights = embed(text, self.dim)
+        self._loaded.wait()
+        with self._lock:
+            if not self._row_of or not len(buckets):
+                return []
+
+            idf = np.log((1.0 + len(self._row_of)) / (1.0 + self._df[buckets])) + 1.0
+            query = np.zeros(self.dim, dtype=np.float32)
+            query[buckets] = weights * idf * idf
+            query /= np.linalg.norm(query)
+
+            entries = slice(0, self._entries)
+            contributions = self._weights[entries] * query[self._buckets[entries]]
+            scores = np.bincount(self._entry_rows[entries], weights=contributions, minlength=self._rows)
+            ids = self._ids[:self._rows].copy()
+
+        scores[ids < 0] = 0
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[row]), float(scores[row])) for row in top if scores[row] > 0]
+
+def _resized(array, capacity):
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
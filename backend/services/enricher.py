@@ -0,0 +1,118 @@
+# backend/services/enricher.py
+import concurrent.futures
+import os
+import threading
+import time
+
+from urllib.parse import urlsplit
+
+from database.db import connection, is_enriched, jobs_by_ids, normalize_url, pending_enrichment, set_enriched
+from scrapers import engine
+from scrapers.sources import NO_DESCRIPTION, SPECS_BY_LABEL
+from scrapers.throttle import HostThrottle, HostUnavailable
+from services import logs
+
+log = logs.get_logger(__name__)
+
+# Detail pages fetched at once; the per-host throttle still paces each board
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "4"))
+
+# Stored jobs still missing a description that one backlog sweep queues, and seconds between
+# sweeps, which also retry fetches that failed or were deferred
+ENRICH_BACKLOG_BATCH = int(os.getenv("ENRICH_BACKLOG_BATCH", "200"))
+ENRICH_SWEEP_INTERVAL = float(os.getenv("ENRICH_SWEEP_INTERVAL", "600"))
+
+# Detail pages per second each host may serve the enricher, on top of leaving the shared
+# throttle's reserve to interactive scrapes; a worker waits at most ENRICH_MAX_WAIT for its turn
+ENRICH_HOST_RATE = float(os.getenv("ENRICH_HOST_RATE", "0.5"))
+ENRICH_MAX_WAIT = 300
+
+class Enricher:
+    """Background pool filling in descriptions from posting detail pages
+
+    Boards whose result cards carry no description store a placeholder;
+    submit() queues a detail-page fetch for each such job and returns at
+    once, so scrapes never wait on it. A URL already being fetched is not
+    queued twice, and a job is only updated while it is still unenriched.
+    Fetches run at a lower priority than scrapes: each host has its own
+    ENRICH_HOST_RATE budget, and the shared throttle is only used where it
+    has capacity to spare. Failures worth retrying (connection errors, 5xx,
+    a host cooling down or busy) leave the job for the next sweep, run
+    every ENRICH_SWEEP_INTERVAL seconds once start() is called.
+    `on_enriched` is called with each updated job.
+    """
+    def __init__(self, on_enriched=None, workers=ENRICH_CONCURRENCY, budget=None):
+        self.on_enriched = on_enriched
+        self.budget = budget or HostThrottle(
+            rate=ENRICH_HOST_RATE, burst=1, min_rate=ENRICH_HOST_RATE, max_rate=ENRICH_HOST_RATE,
+            max_wait=ENRICH_MAX_WAIT
+        )
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='enrich')
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Sweep for unenriched jobs now and every ENRICH_SWEEP_INTERVAL seconds"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='enrich-sweep', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.submit_pending()
+            except Exception as e:
+                log.error('enrich_sweep_failed', error=str(e))
+            self._stop.wait(ENRICH_SWEEP_INTERVAL)
+
+    def submit(self, jobs):
+        """Queue detail fetches for the jobs among `jobs` that still show the placeholder"""
+        for job in jobs:
+            spec = SPECS_BY_LABEL.get(job['source'])
+            if spec is None or spec.detail is None or job['description'] != NO_DESCRIPTION:
+                continue
+            if not job['url'] or job['url'] == 'N/A':
+                continue
+            key = normalize_url(job['url'])
+            with self._lock:
+                if key in self._inflight:
+                    continue
+                self._inflight.add(key)
+            self._executor.submit(self._enrich, key, job['id'], spec, job['url'])
+
+    def submit_pending(self, limit=ENRICH_BACKLOG_BATCH):
+        """Queue the newest stored jobs that were never enriched, e.g. after a restart"""
+        labels = [label for label, spec in SPECS_BY_LABEL.items() if spec.detail is not None]
+        with connection() as conn:
+            jobs = pending_enrichment(conn, labels, NO_DESCRIPTION, limit)
+        self.submit(jobs)
+
+    def _enrich(self, key, job_id, spec, url):
+        try:
+            # Re-scraped jobs arrive with the placeholder again even when their page was already fetched
+            with connection() as conn:
+                if is_enriched(conn, job_id):
+                    return
+            self.budget.acquire(urlsplit(url).netloc)
+            description = engine.scrape_detail(spec, url, background=True)
+        except HostUnavailable as e:
+            log.info('enrich_deferred', job_id=job_id, host=e.host, retry_in=round(e.retry_in, 1))
+            return
+        except Exception as e:
+            log.error('enrich_failed', job_id=job_id, error=str(e))
+            return
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+        # Pages without a description are marked too, so they are not fetched again
+        with connection() as conn:
+            updated = set_enriched(conn, job_id, description, time.time())
+            jobs = jobs_by_ids(conn, [job_id]) if updated and description is not None else []
+        if jobs and self.on_enriched is not None:
+            self.on_enriched(jobs)
@@ -0,0 +1,207 @@
+# backend/services/extractor.py
+# Skills, seniority and salary pulled out of postings locally, without asking Gemini
+import re
+
+# Canonical skill name -> spellings found in postings. Spellings in CASE_SENSITIVE are only
+# matched as written, since in lowercase they are everyday words ("excel at", "swift reply")
+SKILLS = {
+    'Python': ['python'],
+    'Java': ['java'],
+    'JavaScript': ['javascript', 'js', 'ecmascript'],
+    'TypeScript': ['typescript'],
+    'C++': ['c++', 'cpp'],
+    'C#': ['c#', 'csharp'],
+    '.NET': ['.net', 'dotnet', 'asp.net'],
+    'Go': ['golang'],
+    'Rust': ['Rust'],
+    'Ruby': ['ruby'],
+    'PHP': ['php'],
+    'Scala': ['scala'],
+    'Kotlin': ['kotlin'],
+    'Swift': ['Swift'],
+    'SQL': ['sql'],
+    'NoSQL': ['nosql'],
+    'PostgreSQL': ['postgresql', 'postgres'],
+    'MySQL': ['mysql'],
+    'MongoDB': ['mongodb', 'mongo'],
+    'Redis': ['redis'],
+    'Elasticsearch': ['elasticsearch', 'elastic search'],
+    'Snowflake': ['snowflake'],
+    'BigQuery': ['bigquery'],
+    'Redshift': ['redshift'],
+    'Databricks': ['databricks'],
+    'Spark': ['apache spark', 'pyspark', 'Spark'],
+    'Hadoop': ['hadoop'],
+    'Kafka': ['kafka'],
+    'Airflow': ['airflow'],
+    'dbt': ['dbt'],
+    'Tableau': ['tableau'],
+    'Power BI': ['power bi', 'powerbi'],
+    'Excel': ['Excel'],
+    'pandas': ['pandas'],
+    'NumPy': ['numpy'],
+    'scikit-learn': ['scikit-learn', 'scikit learn', 'sklearn'],
+    'TensorFlow': ['tensorflow'],
+    'PyTorch': ['pytorch'],
+    'Keras': ['keras'],
+    'Hugging Face': ['hugging face', 'huggingface'],
+    'LLMs': ['llm', 'llms', 'large language model', 'large language models'],
+    'NLP': ['nlp', 'natural language processing'],
+    'Computer Vision': ['computer vision'],
+    'Machine Learning': ['machine learning', 'ml'],
+    'Deep Learning': ['deep learning'],
+    'React': ['React', 'reactjs', 'react.js'],
+    'Angular': ['angular', 'angularjs'],
+    'Vue': ['vue', 'vuejs', 'vue.js'],
+    'Node.js': ['node.js', 'nodejs'],
+    'Django': ['django'],
+    'Flask': ['flask'],
+    'FastAPI': ['fastapi'],
+    'Spring': ['spring boot', 'spring framework'],
+    'Ruby on Rails': ['ruby on rails', 'Rails'],
+    'HTML': ['html', 'html5'],
+    'CSS': ['css', 'css3'],
+    'GraphQL': ['graphql'],
+    'REST APIs': ['rest api', 'rest apis', 'restful'],
+    'AWS': ['aws', 'amazon web services'],
+    'Azure': ['azure'],
+    'GCP': ['gcp', 'google cloud', 'google cloud platform'],
+    'Docker': ['docker'],
+    'Kubernetes': ['kubernetes', 'k8s'],
+    'Terraform': ['terraform'],
+    'Ansible': ['ansible'],
+    'Jenkins': ['jenkins'],
+    'CI/CD': ['ci/cd', 'cicd'],
+    'Git': ['git', 'github', 'gitlab'],
+    'Linux': ['linux'],
+    'Microservices': ['microservices', 'microservice'],
+    'Agile': ['agile', 'scrum'],
+    'Jira': ['jira'],
+    'Figma': ['figma'],
+    'Salesforce': ['salesforce'],
+    'SAP': ['SAP'],
+    'MATLAB': ['matlab'],
+    'SAS': ['SAS'],
+}
+
+CASE_SENSITIVE = {'Rust', 'Swift', 'Spark', 'Excel', 'SAP', 'SAS', 'React', 'Rails'}
+
+# Seniority levels from least to most senior
+SENIORITY_LEVELS = ('intern', 'junior', 'mid', 'senior', 'lead')
+
+def _spelling_key(text):
+    return re.sub(r'[\s-]+', ' ', text.lower())
+
+_SKILL_OF = {_spelling_key(spelling): skill for skill, spellings in SKILLS.items() for spelling in spellings}
+
+def _alternative(spelling):
+    pattern = r'[\s-]+'.join(re.escape(word) for word in spelling.split())
+    return pattern if spelling not in CASE_SENSITIVE else f'(?-i:{pattern})'
+
+# One pass over the text finds every skill; longer spellings come first so "apache spark" wins over "spark"
+_SKILL_RE = re.compile(
+    r'(?<![\w+#.])(?:'
+    + '|'.join(_alternative(s) for s in sorted({s for spellings in SKILLS.values() for s in spellings}, key=len, reverse=True))
+    + r')(?![\w+#])',
+    re.IGNORECASE
+)
+
+def _level_numeral(numerals):
+    # Roman numerals are a level only as the role's suffix ("Engineer II", "Analyst I - Remote"),
+    # never in "I/O Engineer" or "Phase I Trials Coordinator"
+    return rf'(?<=\w)\s+(?:{numerals})(?=\s*(?:$|[-–—,(|:]))'
+
+# Title words that settle the level outright, most senior first
+_TITLE_LEVELS = (
+    ('intern', re.compile(r'\b(?:intern|internship|co-?op)\b', re.IGNORECASE)),
+    ('lead', re.compile(r'\b(?:lead|staff|principal|distinguished|director|head of|vp|vice president|chief)\b', re.IGNORECASE)),
+    ('senior', re.compile(r'\b(?:senior|sr|snr)\b|' + _level_numeral('iii|iv'), re.IGNORECASE)),
+    ('junior', re.compile(r'\b(?:junior|jr|entry[\s-]level|entry|graduate|new grad|associate)\b|' + _level_numeral('i'), re.IGNORECASE)),
+    ('mid', re.compile(r'\b(?:mid[\s-]level|intermediate)\b|' + _level_numeral('ii'), re.IGNORECASE)),
+)
+
+# "3+ years of experience", "5-7 years' experience"; the lower bound is the requirement
+_YEARS_RE = re.compile(
+    r'\b(\d{1,2})\s*\+?\s*(?:(?:-|–|to)\s*\d{1,2}\s*\+?\s*)?years?\b[^.\n]{0,40}?\bexperience', re.IGNORECASE
+)
+
+# "$120,000 - $150,000 a year", "$60K–$75K", "$45 to $55 per hour"
+_AMOUNT = r'\$\s?(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)(?!\d|[,.]\d)\s*([kK])?(?!\s*(?:m|mm|million|b|bn|billion)\b)'
+_SALARY_RE = re.compile(
+    _AMOUNT + r'(?:\s*(?:-|–|—|to)\s*' + _AMOUNT + r')?'
+    r'(?:\s*(?:/|per|an?|each)\s*(hour|hr|year|yr|annum|month|mo|week|wk|day)\b'
+    r'|\s*(hourly|daily|weekly|monthly|yearly|annually)\b)?',
+    re.IGNORECASE
+)
+
+# Words saying an amount without a period is pay, looked for shortly before or after it
+_PAY_CONTEXT_RE = re.compile(r'\b(?:salary|salaries|pay|paid|compensation|wage|wages|range|base|ote)\b', re.IGNORECASE)
+
+# Multipliers to a yearly figure, assuming full-time hours
+_PER_YEAR = {
+    'hour': 2080, 'hr': 2080, 'hourly': 2080, 'day': 260, 'daily': 260, 'week': 52, 'wk': 52, 'weekly': 52,
+    'month': 12, 'mo': 12, 'monthly': 12, 'year': 1, 'yr': 1, 'annum': 1, 'yearly': 1, 'annually': 1,
+}
+
+# Yearly salaries outside this range are taken to be something else (bonuses, revenue, a typo)
+SALARY_BOUNDS = (10_000, 1_000_000)
+
+def extract_skills(text):
+    """Canonical names of the skills mentioned in `text`, sorted"""
+    return sorted({_SKILL_OF[_spelling_key(match)] for match in _SKILL_RE.findall(text or '')})
+
+def extract_seniority(title, description=None):
+    """One of SENIORITY_LEVELS, from the title if it says, else from the years of experience asked for
+
+    Returns None when neither gives a hint.
+    """
+    for level, pattern in _TITLE_LEVELS:
+        if pattern.search(title or ''):
+            return level
+    years = [int(match) for match in _YEARS_RE.findall(description or '') if int(match) <= 20]
+    if not years:
+        return None
+    required = min(years)
+    if required < 2:
+        return 'junior'
+    if required < 5:
+        return 'mid'
+    return 'senior'
+
+def _amount(number, thousands):
+    value = float(number.replace(',', ''))
+    return value * 1000 if thousands else value
+
+def extract_salary(text):
+    """(low, high) yearly pay in dollars from the first salary-like mention in `text`, or (None, None)
+
+    Hourly, daily, weekly and monthly rates are scaled to a year. Amounts
+    with no period count as yearly pay only next to a word like salary or
+    pay, so a "$100 stipend" or "$2M funding" is never taken for one.
+    """
+    text = text or ''
+    for match in _SALARY_RE.finditer(text):
+        low = _amount(match.group(1), match.group(2))
+        high = _amount(match.group(3), match.group(4) or match.group(2)) if match.group(3) else low
+        period = (match.group(5) or match.group(6) or '').lower()
+        if period:
+            factor = _PER_YEAR[period]
+        elif _PAY_CONTEXT_RE.search(text[max(match.start() - 80, 0):match.end() + 40]):
+            factor = 1
+        else:
+            continue
+        low, high = sorted((round(low * factor), round(high * factor)))
+        if SALARY_BOUNDS[0] <= low and high <= SALARY_BOUNDS[1]:
+            return low, high
+    return None, None
+
+def extract(title, description):
+    """Skills, seniority and yearly salary range of a posting"""
+    text = f"{title}\n{description or ''}"
+    salary_min, salary_max = extract_salary(text)
+    return {
+        'skills': extract_skills(text),
+        'seniority': extract_seniority(title, description),
+        'salary_min': salary_min,
+        'salary_max': salary_max,
+    }
@@ -1,22 +1,140 @@
 # backend/services/gemini_service.py
 import google.generativeai as genai
+import functools
+import inspect
 import os
+import json
+import math
+import time
 from dotenv import load_dotenv
 
+from services import logs, metrics
+from services.cache import ResultCache
+
+log = logs.get_logger(__name__)
+
 # Load environment variables
 load_dotenv()
 
 # Configure the Gemini API
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
+MODEL_NAME = 'gemini-pro'
+
+# Bump an entry whenever its prompt changes so stale cached results are not served
+PROMPT_VERSIONS = {
+    'analyze': 1,
+    'summarize': 1,
+    'insights': 2,
+}
+
+# Cached market insights are regenerated once the job total grows or shrinks by this factor
+INSIGHTS_TOTAL_STEP = 1.1
+
+# Prompt budget for one batched analysis call, estimated at ~4 characters per token,
+# and the most descriptions packed into one call regardless of size
+BATCH_TOKEN_BUDGET = int(os.getenv("GEMINI_BATCH_TOKEN_BUDGET", "12000"))
+BATCH_MAX_JOBS = int(os.getenv("GEMINI_BATCH_MAX_JOBS", "20"))
+
+# Per-method latency (cache hits included), and the API calls behind it with their token usage
+METHOD_SECONDS = metrics.histogram(
+    'gemini_method_seconds', 'Time spent in a GeminiService method, to the last chunk when streaming', ('method',)
+)
+API_SECONDS = metrics.histogram(
+    'gemini_api_seconds', 'Latency of one Gemini API call, to the last chunk when streaming', ('method',)
+)
+API_CALLS = metrics.counter('gemini_api_calls_total', 'Gemini API calls by outcome', ('method', 'outcome'))
+TOKENS = metrics.counter(
+    'gemini_tokens_total', 'Prompt and output tokens, estimated when the API reports no usage', ('method', 'kind')
+)
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+def _instrumented(method):
+    # Times every call of the decorated method; a returned generator is timed until it is exhausted or closed
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                METHOD_SECONDS.observe(time.perf_counter() - started, method=method)
+                raise
+            if inspect.isgenerator(result):
+                return _timed_chunks(result, method, started)
+            METHOD_SECONDS.observe(time.perf_counter() - started, method=method)
+            return result
+        return wrapper
+    return decorate
+
+def _timed_chunks(chunks, method, started):
+    try:
+        yield from chunks
+    finally:
+        METHOD_SECONDS.observe(time.perf_counter() - started, method=method)
+
+def _record_usage(method, response, prompt, text):
+    usage = getattr(response, 'usage_metadata', None)
+    TOKENS.inc(getattr(usage, 'prompt_token_count', 0) or estimate_tokens(prompt), method=method, kind='prompt')
+    TOKENS.inc(getattr(usage, 'candidates_token_count', 0) or estimate_tokens(text), method=method, kind='output')
+
+def pack_batches(descriptions, token_budget=BATCH_TOKEN_BUDGET, max_jobs=BATCH_MAX_JOBS):
+    """Group (index, description) pairs into batches that fit the prompt budget
+
+    A description too large for the budget on its own still gets a batch of one.
+    """
+    batches = []
+    current = []
+    used = 0
+    for index, description in descriptions:
+        cost = estimate_tokens(description)
+        if current and (used + cost > token_budget or len(current) >= max_jobs):
+            batches.append(current)
+            current = []
+            used = 0
+        current.append((index, description))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def parse_json_array(text):
+    """Pull the JSON array out of a model reply, tolerating code fences and chatter around it"""
+    return _parse_json(text, '[', ']', "array")
+
+def parse_json_object(text):
+    """Pull the JSON object out of a model reply, like parse_json_array"""
+    return _parse_json(text, '{', '}', "object")
+
+def _parse_json(text, opening, closing, kind):
+    start = text.find(opening)
+    end = text.rfind(closing)
+    if start == -1 or end < start:
+        raise ValueError(f"No JSON {kind} in response")
+    return json.loads(text[start:end + 1])
+
 class GeminiService:
-    def __init__(self):
+    def __init__(self, cache=None):
         # Initialize the model
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model = genai.GenerativeModel(MODEL_NAME)
+        self.cache = cache if cache is not None else ResultCache()
     
+    @_instrumented('analyze')
     def analyze_job_description(self, description):
         """Extract key information from job descriptions"""
-        prompt = f"""
+        key = self.cache.key('analyze', MODEL_NAME, PROMPT_VERSIONS['analyze'], description)
+        return self.cache.get_or_compute(key, lambda: self._generate('analyze', self._analyze_prompt(description)))
+    
+    @_instrumented('analyze_stream')
+    def stream_analyze_job_description(self, description):
+        """Like analyze_job_description, but yields the text as the model produces it"""
+        key = self.cache.key('analyze', MODEL_NAME, PROMPT_VERSIONS['analyze'], description)
+        return self._stream_cached('analyze', key, lambda: self._analyze_prompt(description))
+    
+    def _analyze_prompt(self, description):
+        return f"""
         Analyze this job description and extract the following information:
         - Required skills (technical and soft skills)
         - Experience level (entry, mid, senior)
@@ -29,27 +147,103 @@ class GeminiService:
         
         Return the information in JSON format.
         """
+    
+    @_instrumented('analyze_batch')
+    def analyze_jobs_batch(self, descriptions):
+        """Analyze many job descriptions with as few LLM calls as possible
+
+        Cached and repeated descriptions are never sent; the rest are packed
+        into token-budgeted prompts. Jobs missing from a batch reply, or whose
+        batch failed outright, fall back to one call each. Returns one entry
+        per description, in order: {"analysis": dict}, or {"error": message}
+        for a job whose fallback call failed or gave no JSON object.
+        """
+        # Parsed analyses are cached apart from analyze_job_description's raw replies
+        keys = [self.cache.key('analyze_batch', MODEL_NAME, PROMPT_VERSIONS['analyze'], d) for d in descriptions]
+        results = {}
+        misses = {}
+        for key, description in zip(keys, descriptions):
+            if key in results or key in misses:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[key] = {"analysis": json.loads(cached)}
+            else:
+                misses[key] = description
+        
+        for batch in pack_batches(list(misses.items())):
+            try:
+                analyses = self._analyze_batch([description for _, description in batch])
+            except Exception as e:
+                log.warning('batch_analysis_failed', jobs=len(batch), error=str(e))
+                analyses = {}
+            
+            for position, (key, description) in enumerate(batch):
+                analysis = analyses.get(position)
+                if analysis is None:
+                    try:
+                        analysis = parse_json_object(self.analyze_job_description(description))
+                    except Exception as e:
+                        log.warning('job_analysis_failed', error=str(e))
+                        results[key] = {"error": str(e)}
+                        continue
+                results[key] = {"analysis": analysis}
+                self.cache.set(key, json.dumps(analysis))
+        
+        return [results[key] for key in keys]
+    
+    def _analyze_batch(self, descriptions):
+        # Returns {position: analysis dict} for the jobs the model answered
+        jobs_text = "\n\n".join(
+            f"### Job {i}\n{description}" for i, description in enumerate(descriptions)
+        )
+        prompt = f"""
+        Analyze each of the {len(descriptions)} job descriptions below and extract the following information:
+        - Required skills (technical and soft skills)
+        - Experience level (entry, mid, senior)
+        - Education requirements
+        - Key responsibilities
+        - Benefits (if mentioned)
+        
+        {jobs_text}
+        
+        Return a JSON array with one object per job, each including a "job" field set to the job's number.
+        """
         
-        response = self.model.generate_content(prompt)
-        return response.text
+        analyses = {}
+        for item in parse_json_array(self._generate('analyze_batch', prompt)):
+            if isinstance(item, dict) and isinstance(item.get('job'), int) and 0 <= item['job'] < len(descriptions):
+                analyses[item.pop('job')] = item
+        return analyses
     
+    @_instrumented('summarize')
     def summarize_job(self, description, max_bullets=5):
         """Create a concise summary of a job description"""
-        prompt = f"""
+        key = self.cache.key(f'summarize:{max_bullets}', MODEL_NAME, PROMPT_VERSIONS['summarize'], description)
+        return self.cache.get_or_compute(
+            key, lambda: self._generate('summarize', self._summarize_prompt(description, max_bullets))
+        )
+    
+    @_instrumented('summarize_stream')
+    def stream_summarize_job(self, description, max_bullets=5):
+        """Like summarize_job, but yields the text as the model produces it"""
+        key = self.cache.key(f'summarize:{max_bullets}', MODEL_NAME, PROMPT_VERSIONS['summarize'], description)
+        return self._stream_cached('summarize', key, lambda: self._summarize_prompt(description, max_bullets))
+    
+    def _summarize_prompt(self, description, max_bullets):
+        return f"""
         Summarize this job description in {max_bullets} bullet points highlighting the most important aspects:
         
         {description}
         """
-        
-        response = self.model.generate_content(prompt)
-        return response.text
     
+    @_instrumented('recommendations')
     def get_job_recommendations(self, user_skills, user_experience, job_listings, max_results=5):
         """Find the best job matches based on user profile"""
         # Format job listings for the prompt
         job_listings_text = "\n\n".join([
-            f"Job {i+1}:\nTitle: {job['title']}\nCompany: {job['company']}\nDescription: {job['description']}"
-            for i, job in enumerate(job_listings[:20])  # Limit to first 20 for API constraints
+            f"Job {job['id']}:\nTitle: {job['title']}\nCompany: {job['company']}\nDescription: {job['description']}"
+            for job in job_listings[:20]  # Callers pass pre-ranked candidates; cap for API constraints
         ])
         
         prompt = f"""
@@ -66,24 +260,52 @@ class GeminiService:
         Return your answer in JSON format with job IDs and match explanations.
         """
         
-        response = self.model.generate_content(prompt)
-        return response.text
+        return self._generate('recommendations', prompt)
+    
+    @_instrumented('insights')
+    def generate_job_market_insights(self, stats):
+        """Generate insights about the current job market from the aggregate counts
+
+        `stats` is database.db.market_stats() output. The generated text is
+        cached until the market changes meaningfully: a different set of
+        leading companies, title terms, skills or sources, or the total moving by
+        more than INSIGHTS_TOTAL_STEP.
+        """
+        return self.cache.get_or_compute(
+            self._insights_key(stats), lambda: self._generate('insights', self._insights_prompt(stats))
+        )
     
-    def generate_job_market_insights(self, job_listings):
-        """Generate insights about the current job market based on scraped listings"""
-        # Prepare data for analysis
-        titles = [job['title'] for job in job_listings]
-        companies = [job['company'] for job in job_listings]
-        locations = [job['location'] for job in job_listings]
+    @_instrumented('insights_stream')
+    def stream_job_market_insights(self, stats):
+        """Like generate_job_market_insights, but yields the text as the model produces it"""
+        return self._stream_cached('insights', self._insights_key(stats), lambda: self._insights_prompt(stats))
+    
+    def _insights_key(self, stats):
+        snapshot = json.dumps({
+            'companies': sorted(value for value, _ in stats['company'][:10]),
+            'title_terms': sorted(value for value, _ in stats['title_term'][:10]),
+            'skills': sorted(value for value, _ in stats['skill'][:10]),
+            'sources': sorted(value for value, _ in stats['source']),
+            'total_bucket': round(math.log(stats['total'] + 1, INSIGHTS_TOTAL_STEP)),
+        })
+        return self.cache.key('insights', MODEL_NAME, PROMPT_VERSIONS['insights'], snapshot)
+    
+    def _insights_prompt(self, stats):
+        def counted(pairs):
+            return ", ".join(f"{value} ({count})" for value, count in pairs)
         
         data_summary = f"""
-        Job Titles: {titles[:30]}
-        Companies: {list(set(companies))[:30]}
-        Locations: {list(set(locations))[:30]}
-        Total Jobs: {len(job_listings)}
+        Most common title terms: {counted(stats['title_term'])}
+        Most requested skills: {counted(stats['skill'])}
+        Jobs per seniority level: {counted(stats['seniority'])}
+        Top hiring companies: {counted(stats['company'])}
+        Top locations: {counted(stats['location'])}
+        Jobs per source: {counted(stats['source'])}
+        Jobs per day (most recent first): {counted(stats['day'])}
+        Total Jobs: {stats['total']}
         """
         
-        prompt = f"""
+        return f"""
         Based on this job market data, provide 3-5 key insights about trends, in-demand skills, and market conditions.
         
         Data:
@@ -91,6 +313,43 @@ class GeminiService:
         
         Format your insights as bullet points with brief explanations.
         """
+    
+    def _generate(self, method, prompt):
+        # `method` labels the call's latency and token usage in the metrics
+        outcome = 'error'
+        try:
+            with metrics.timer(API_SECONDS, 'gemini', method=method):
+                response = self.model.generate_content(prompt)
+                text = response.text
+            outcome = 'ok'
+        finally:
+            API_CALLS.inc(method=method, outcome=outcome)
+        _record_usage(method, response, prompt, text)
+        return text
+    
+    def _stream_cached(self, method, key, build_prompt):
+        # Serve a cached result in one piece; otherwise stream chunks and cache the full text at the end
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
         
-        response = self.model.generate_content(prompt)
-        return response.text
\ No newline at end of file
+        prompt = build_prompt()
+        parts = []
+        outcome = 'error'
+        try:
+            with metrics.timer(API_SECONDS, 'gemini', method=method):
+                response = self.model.generate_content(prompt, stream=True)
+                for chunk in response:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            outcome = 'ok'
+        except GeneratorExit:
+            # The client went away mid-reply
+            outcome = 'cancelled'
+            raise
+        finally:
+            API_CALLS.inc(method=method, outcome=outcome)
+        # The API reports usage once the whole reply has been read
+        _record_usage(method, response, prompt, "".join(parts))
+        self.cache.set(key, "".join(parts))
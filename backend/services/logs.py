@@ -0,0 +1,47 @@
+# backend/services/logs.py
+# Structured logging: one JSON object per line on stderr, event name plus its fields
+import json
+import logging
+import os
+import sys
+
+# Least severe level written out
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Every module logger hangs off this one, so the app's output is configured in one place
+ROOT_LOGGER = 'jobs'
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class EventLogger(logging.LoggerAdapter):
+    """Logger taking an event name and keyword fields, e.g. log.error('scrape_failed', source='indeed', error=str(e))"""
+    def process(self, msg, kwargs):
+        reserved = {key: kwargs.pop(key) for key in ('exc_info', 'stack_info', 'stacklevel') if key in kwargs}
+        reserved['extra'] = {'fields': kwargs}
+        return msg, reserved
+
+def _configure():
+    root = logging.getLogger(ROOT_LOGGER)
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+
+_configure()
+
+def get_logger(name):
+    """EventLogger for module `name`, writing through the app's JSON handler"""
+    return EventLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"), {})
@@ -0,0 +1,191 @@
+# backend/services/metrics.py
+# In-process counters, gauges and histograms, exposed in the Prometheus text format,
+# plus per-request timings for the Server-Timing header
+import contextlib
+import contextvars
+import threading
+import time
+
+# Upper bounds in seconds for latency histograms; requests to a board or Gemini take up to tens of seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+class Counter:
+    """Monotonic count per label set"""
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, key, value
+
+class Histogram:
+    """Observations per label set, counted into cumulative `buckets` as Prometheus expects"""
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [count per bucket, then +Inf], sum
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self, labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            else:
+                entry[0][-1] += 1
+            entry[1] += value
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", key + (('le', _format_value(bound)),), cumulative
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, cumulative
+
+class Gauge:
+    """Current values read when rendered, for state another object already keeps
+
+    `collect()` returns {tuple of label values, in `labels` order: value}.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, help, labels=(), collect=dict):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.collect = collect
+
+    def samples(self):
+        for values, value in sorted(self.collect().items()):
+            yield self.name, tuple(zip(self.labels, values)), value
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, labels=(), collect=dict):
+        return self._register(Gauge(name, help, labels, collect))
+
+    def _register(self, metric):
+        # Registering the same name twice hands back the first metric, so modules can be reloaded
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                labels = ",".join(f'{label}="{_escape(str(v))}"' for label, v in key)
+                lines.append(f"{name}{{{labels}}} {_format_value(value)}" if labels else f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+def _label_key(metric, labels):
+    if set(labels) != set(metric.labels):
+        raise ValueError(f"{metric.name} takes labels {metric.labels}, got {tuple(labels)}")
+    return tuple((label, labels[label]) for label in metric.labels)
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+# The process-wide registry behind /api/metrics
+REGISTRY = Registry()
+counter = REGISTRY.counter
+histogram = REGISTRY.histogram
+gauge = REGISTRY.gauge
+render = REGISTRY.render
+
+class RequestTimings:
+    """Seconds spent per phase ('fetch', 'parse', 'db', 'gemini') while serving one request
+
+    Phases timed on several threads at once add up, so their total can
+    exceed the request's wall time.
+    """
+    def __init__(self):
+        self._phases = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            total, count = self._phases.get(phase, (0.0, 0))
+            self._phases[phase] = (total + seconds, count + 1)
+
+    def header(self, total=None):
+        """Server-Timing header value, durations in milliseconds"""
+        with self._lock:
+            phases = sorted(self._phases.items())
+        entries = [f'{phase};dur={seconds * 1000:.1f};desc="{count}x"' for phase, (seconds, count) in phases]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+# Timings of the request being served; worker threads see it when submitted with
+# contextvars.copy_context().run
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+def begin_request(collect):
+    """Start collecting timings for the request on this thread, or stop if `collect` is false
+
+    Returns the new RequestTimings, or None.
+    """
+    timings = RequestTimings() if collect else None
+    _request_timings.set(timings)
+    return timings
+
+@contextlib.contextmanager
+def timer(histogram, phase=None, **labels):
+    """Observe the block's duration in `histogram`, and add it to the request's `phase` timing if one is collected"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, **labels)
+        timings = _request_timings.get()
+        if phase is not None and timings is not None:
+            timings.add(phase, elapsed)
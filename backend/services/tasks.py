@@ -0,0 +1,93 @@
+# backend/services/tasks.py
+import concurrent.futures
+import os
+import threading
+import time
+import uuid
+
+from services import logs
+
+log = logs.get_logger(__name__)
+
+# Gemini calls allowed in flight at once, and queued tasks accepted before new ones are refused
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_PENDING = int(os.getenv("LLM_MAX_PENDING", "100"))
+
+# Seconds a finished task's result stays available for polling
+TASK_RESULT_TTL = float(os.getenv("TASK_RESULT_TTL", "600"))
+
+class QueueFull(Exception):
+    """Raised by TaskQueue.submit when the backlog is already at its limit"""
+
+class TaskQueue:
+    """In-process queue running slow calls on a bounded worker pool
+
+    submit() returns a task id straight away; get() reports the task's
+    status ('queued', 'running', 'done' or 'error') and, once finished, its
+    result or error message.
+    """
+    def __init__(self, workers=LLM_MAX_CONCURRENCY, max_pending=LLM_MAX_PENDING, ttl=TASK_RESULT_TTL, slots=None):
+        self.max_pending = max_pending
+        # Optional semaphore shared with other callers of the same backend (e.g. streaming endpoints)
+        self.slots = slots
+        self.ttl = ttl
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='llm')
+        self._tasks = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) and return its task id"""
+        with self._lock:
+            self._prune()
+            if self._pending >= self.max_pending:
+                raise QueueFull(f"{self._pending} tasks already waiting")
+            task_id = uuid.uuid4().hex
+            self._tasks[task_id] = {
+                'task_id': task_id,
+                'kind': kind,
+                'status': 'queued',
+                'created_at': time.time(),
+                'finished_at': None,
+            }
+            self._pending += 1
+
+        self._executor.submit(self._run, task_id, fn, args, kwargs)
+        return task_id
+
+    def get(self, task_id):
+        """Snapshot of a task, or None if it is unknown or has expired"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return dict(task) if task is not None else None
+
+    def _run(self, task_id, fn, args, kwargs):
+        if self.slots is not None:
+            self.slots.acquire()
+        self._update(task_id, status='running')
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            log.error('task_failed', task_id=task_id, error=str(e))
+            self._update(task_id, status='error', error=str(e), finished_at=time.time())
+        else:
+            self._update(task_id, status='done', result=result, finished_at=time.time())
+        finally:
+            if self.slots is not None:
+                self.slots.release()
+            with self._lock:
+                self._pending -= 1
+
+    def _update(self, task_id, **fields):
+        with self._lock:
+            self._tasks[task_id].update(fields)
+
+    def _prune(self):
+        # Caller holds the lock; forget results nobody collected in time
+        cutoff = time.time() - self.ttl
+        expired = [
+            task_id for task_id, task in self._tasks.items()
+            if task['finished_at'] is not None and task['finished_at'] < cutoff
+        ]
+        for task_id in expired:
+            del self._tasks[task_id]
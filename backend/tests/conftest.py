@@ -0,0 +1,52 @@
+# Tests import the backend packages (scrapers, database, services) the way app.py does
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import db, migrations
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of an empty jobs database at the newest schema version"""
+    path = str(tmp_path / 'jobs.db')
+    conn = db.connect(path)
+    try:
+        migrations.migrate(conn)
+    finally:
+        conn.close()
+    return path
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The Flask app module, imported against a fresh database rather than backend/jobs.db"""
+    db.DATABASE = str(tmp_path_factory.mktemp('app') / 'jobs.db')
+    import app
+    return app
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+def wait_for_task(client, response, timeout=5):
+    """Poll a queued task's Location until it finishes, returning its final state"""
+    deadline = time.monotonic() + timeout
+    while True:
+        task = client.get(response.headers['Location']).get_json()
+        if task['status'] in ('done', 'error') or time.monotonic() > deadline:
+            return task
+        time.sleep(0.01)
+
+class StubModel:
+    """Stands in for the Gemini model: `reply(prompt)` gives each answer's text, and `prompts` records the calls"""
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        return types.SimpleNamespace(text=self.reply(prompt), usage_metadata=None)
@@ -0,0 +1,77 @@
+import pytest
+
+from conftest import StubModel, wait_for_task
+from database import db
+from services.cache import ResultCache
+from services.gemini_service import GeminiService
+
+class StubGemini:
+    def analyze_job_description(self, description):
+        return f"analysis of {description}"
+
+    def summarize_job(self, description):
+        return f"summary of {description}"
+
+@pytest.fixture
+def job_id(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'gemini_service', StubGemini())
+    conn = db.connect()
+    try:
+        db.upsert_jobs(conn, [{
+            'title': 'Python Developer', 'company': 'Acme', 'location': 'Berlin', 'source': 'LinkedIn',
+            'description': 'Build APIs', 'url': 'https://linkedin.com/jobs/app-1', 'date_posted': '2024-01-01',
+        }])
+        return conn.execute("SELECT id FROM jobs WHERE url = 'https://linkedin.com/jobs/app-1'").fetchone()[0]
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize('endpoint, field', [('/api/analyze', 'analysis'), ('/api/summarize', 'summary')])
+def test_job_ids_may_be_numeric_strings(client, job_id, endpoint, field):
+    response = client.post(endpoint, json={'job_id': str(job_id)})
+    assert response.status_code == 202
+    task = wait_for_task(client, response)
+    assert task['result']['job_id'] == job_id
+    assert task['result'][field].endswith('Build APIs')
+
+@pytest.mark.parametrize('endpoint', ['/api/analyze', '/api/summarize', '/api/analyze/stream', '/api/summarize/stream'])
+@pytest.mark.parametrize('value', ['abc', None, True, 1.5])
+def test_non_integer_job_ids_are_rejected(client, job_id, endpoint, value):
+    response = client.post(endpoint, json={'job_id': value})
+    assert response.status_code == 400
+
+def test_unknown_job_is_not_found(client, job_id):
+    assert client.post('/api/analyze', json={'job_id': job_id + 1000}).status_code == 404
+
+def test_batch_analysis_sends_only_uncached_jobs(client, app_module, monkeypatch):
+    def reply(prompt):
+        if '### Job' in prompt:
+            # A short reply: the second job is left out, so it falls back to a call of its own
+            return '```json\n[{"job": 0, "level": "senior"}]\n```'
+        return '{"level": "mid"}'
+
+    service = GeminiService(cache=ResultCache(path=db.DATABASE))
+    service.model = StubModel(lambda prompt: '[{"job": 0, "level": "cached"}]')
+    monkeypatch.setattr(app_module, 'gemini_service', service)
+    conn = db.connect()
+    try:
+        db.upsert_jobs(conn, [{
+            'title': title, 'company': 'Acme', 'location': 'Berlin', 'source': 'LinkedIn',
+            'description': f"{title} building payment APIs", 'url': f"https://linkedin.com/jobs/batch-{i}",
+            'date_posted': '2024-01-01',
+        } for i, title in enumerate(['Cached Engineer', 'Senior Engineer', 'Backend Engineer'])])
+        ids = [row[0] for row in conn.execute("SELECT id FROM jobs WHERE url LIKE '%/batch-%' ORDER BY url")]
+    finally:
+        conn.close()
+    service.analyze_jobs_batch(['Cached Engineer building payment APIs'])
+    service.model = StubModel(reply)
+
+    response = client.post('/api/analyze/batch', json={'job_ids': [str(ids[0]), ids[1], ids[2], ids[2] + 1000]})
+    assert response.status_code == 202
+    result = wait_for_task(client, response)['result']
+    assert result['missing'] == [ids[2] + 1000]
+    assert {item['job_id']: item['analysis']['level'] for item in result['analyses']} == {
+        ids[0]: 'cached', ids[1]: 'senior', ids[2]: 'mid'
+    }
+    # One batch call for the two uncached jobs, then a fallback for the one it left out
+    assert len(service.model.prompts) == 2
+    assert 'Cached Engineer' not in ''.join(service.model.prompts)
@@ -0,0 +1,84 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database import db, migrations
+
+def _job(source, url, title='Senior Python Developer'):
+    return {
+        'title': title, 'company': 'Acme Corp', 'location': 'Berlin, Germany', 'source': source,
+        'description': 'Build APIs in Python.', 'url': url, 'date_posted': '2024-01-01',
+    }
+
+def _clusters(conn):
+    rows = conn.execute('SELECT url, canonical_id FROM jobs ORDER BY id').fetchall()
+    return {url: canonical_id for url, canonical_id in rows}
+
+def test_only_postings_from_different_boards_are_merged(db_path):
+    conn = db.connect(db_path)
+    db.upsert_jobs(conn, [
+        _job('LinkedIn', 'https://linkedin.com/jobs/1'),
+        _job('LinkedIn', 'https://linkedin.com/jobs/2'),
+        _job('Indeed', 'https://indeed.com/viewjob?jk=1'),
+        _job('Indeed', 'https://indeed.com/viewjob?jk=2'),
+    ])
+    clusters = _clusters(conn)
+
+    # The same board's listings stay apart; each joins at most one posting from the other board
+    assert clusters['https://linkedin.com/jobs/1'] != clusters['https://linkedin.com/jobs/2']
+    assert clusters['https://indeed.com/viewjob?jk=1'] == clusters['https://linkedin.com/jobs/1']
+    assert clusters['https://indeed.com/viewjob?jk=2'] == clusters['https://linkedin.com/jobs/2']
+    unique = conn.execute("SELECT count FROM job_stats WHERE dimension = 'unique'").fetchone()[0]
+    assert unique == 2
+
+def test_migrate_refuses_connections_without_the_schema_functions(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'jobs.db'))
+    with pytest.raises(RuntimeError, match='inflate'):
+        migrations.migrate(conn)
+    assert migrations.schema_version(conn) == 0
+
+def test_concurrent_upserts_of_the_same_jobs(db_path):
+    jobs = [_job('LinkedIn', f'https://linkedin.com/jobs/{i}', title=f'Python Developer {i}') for i in range(200)]
+    start = threading.Barrier(2)
+    results, errors = [], []
+
+    def store():
+        conn = db.connect(db_path)
+        try:
+            start.wait()
+            results.append(db.upsert_jobs(conn, jobs))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=store) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(result['inserted'] for result in results) == [0, 200]
+    conn = db.connect(db_path)
+    assert conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 200
+    assert conn.execute("SELECT count FROM job_stats WHERE dimension = 'title_term' AND value = 'python'").fetchone()[0] == 200
+    assert conn.execute("SELECT count FROM job_stats WHERE dimension = 'unique'").fetchone()[0] == 200
+
+def test_collapse_keeps_clusters_whose_canonical_job_is_filtered_out(db_path):
+    conn = db.connect(db_path)
+    db.upsert_jobs(conn, [
+        _job('LinkedIn', 'https://linkedin.com/jobs/1'),
+        _job('Indeed', 'https://indeed.com/viewjob?jk=1'),
+        _job('Indeed', 'https://indeed.com/viewjob?jk=2', title='Rust Developer'),
+    ])
+
+    jobs, _ = db.query_jobs(conn, 10, source='Indeed', collapse=True)
+    assert sorted(job['url'] for job in jobs) == ['https://indeed.com/viewjob?jk=1', 'https://indeed.com/viewjob?jk=2']
+    jobs, _ = db.query_jobs(conn, 10, collapse=True)
+    assert sorted(job['url'] for job in jobs) == ['https://indeed.com/viewjob?jk=2', 'https://linkedin.com/jobs/1']
+
+    jobs, _ = db.search_jobs(conn, 'senior', 10, source='Indeed', collapse=True)
+    assert [job['url'] for job in jobs] == ['https://indeed.com/viewjob?jk=1']
+    assert db.job_analytics(conn, source='Indeed', collapse=True)['total'] == 2
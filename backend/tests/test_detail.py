@@ -0,0 +1,36 @@
+from benchmarks.stub_server import load_fixture, start_stub_server
+from scrapers import engine
+from scrapers.sources import GLASSDOOR, LINKEDIN
+
+def test_linkedin_detail_page():
+    description = engine.parse_detail(LINKEDIN, load_fixture('linkedin_detail'))
+    assert description.startswith("Acme Analytics is hiring a Senior Python Developer")
+    # Paragraphs and list items stay on their own lines; navigation and scripts are left out
+    assert "\nDesign and maintain Flask and FastAPI services\n" in description
+    assert "Salary: $140,000 - $170,000 per year." in description
+    assert "LinkedIn" not in description and "trackingData" not in description
+
+def test_glassdoor_detail_page():
+    description = engine.parse_detail(GLASSDOOR, load_fixture('glassdoor_detail'))
+    assert description.startswith("Northwind Traders is looking for a Data Engineer")
+    assert "\nModel data in Snowflake and dbt\n" in description
+    assert description.endswith("Pay: $110K - $135K (Employer est.)")
+
+def test_detail_page_without_description():
+    assert engine.parse_detail(LINKEDIN, load_fixture('glassdoor_detail')) is None
+
+def test_scrape_detail_fetches_the_page():
+    server, base_url = start_stub_server(load_fixture('linkedin_detail'))
+    try:
+        description = engine.scrape_detail(LINKEDIN, f"{base_url}/jobs/view/1")
+        assert description == engine.parse_detail(LINKEDIN, load_fixture('linkedin_detail'))
+        assert server.hits == {200: 1}
+    finally:
+        server.shutdown()
+
+def test_scrape_detail_of_a_removed_posting():
+    server, base_url = start_stub_server("Not found", status=404)
+    try:
+        assert engine.scrape_detail(GLASSDOOR, f"{base_url}/job-listing/2", background=True) is None
+    finally:
+        server.shutdown()
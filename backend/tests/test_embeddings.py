@@ -0,0 +1,54 @@
+import threading
+
+from services.embeddings import JobIndex
+
+def _job(job_id, title, description=''):
+    return {'id': job_id, 'title': title, 'company': 'Acme', 'description': description}
+
+def test_search_ranks_shared_rare_terms_first():
+    index = JobIndex()
+    index.add_many([
+        _job(1, 'Python Developer', 'Django and PostgreSQL'),
+        _job(2, 'Java Developer', 'Spring and Kafka'),
+        _job(3, 'Data Engineer', 'Python, Spark and Airflow'),
+    ])
+    ranked = [job_id for job_id, _ in index.search('python django')]
+    assert ranked[0] == 1
+    assert 2 not in ranked[:2]
+    assert all(0 < score <= 1 for _, score in index.search('python django'))
+
+def test_readding_a_job_replaces_its_row():
+    index = JobIndex()
+    index.add_many([_job(1, 'Python Developer'), _job(2, 'Rust Developer')])
+    # Enough re-adds to trigger compaction of the retired rows
+    for _ in range(5):
+        index.add_many([_job(1, 'Golang Developer')])
+    assert len(index) == 2
+    assert [job_id for job_id, _ in index.search('golang')] == [1]
+    assert index.search('python') == []
+    assert [job_id for job_id, _ in index.search('rust')] == [2]
+
+def test_bulk_load_keeps_newer_rows():
+    index = JobIndex()
+    index.add_many([_job(1, 'Golang Developer')])
+    index.add_many([_job(1, 'Python Developer'), _job(2, 'Rust Developer')], replace=False)
+    assert [job_id for job_id, _ in index.search('golang')] == [1]
+    assert [job_id for job_id, _ in index.search('rust')] == [2]
+
+def test_search_waits_for_background_load():
+    index = JobIndex()
+    release = threading.Event()
+
+    def load(index):
+        release.wait()
+        index.add_many([_job(1, 'Python Developer')], replace=False)
+
+    index.load_in_background(load)
+    results = []
+    searcher = threading.Thread(target=lambda: results.append(index.search('python')))
+    searcher.start()
+    searcher.join(0.2)
+    assert searcher.is_alive()
+    release.set()
+    searcher.join(5)
+    assert [job_id for job_id, _ in results[0]] == [1]
@@ -0,0 +1,59 @@
+import pytest
+
+from services.extractor import extract_salary, extract_seniority, extract_skills
+
+@pytest.mark.parametrize('title, level', [
+    ('Software Engineer I', 'junior'),
+    ('Data Analyst I - Remote', 'junior'),
+    ('Software Engineer II', 'mid'),
+    ('Backend Developer II (Payments)', 'mid'),
+    ('Software Engineer III', 'senior'),
+    ('Network Engineer IV, Cloud', 'senior'),
+    ('Senior Python Developer', 'senior'),
+    ('Jr. Frontend Developer', 'junior'),
+    ('Staff Engineer', 'lead'),
+    ('Summer Intern - Data', 'intern'),
+    # Roman numerals anywhere but the role's suffix say nothing about the level
+    ('I/O Engineer', None),
+    ('Phase I Clinical Trials Coordinator', None),
+    ('Storage I/O Performance Engineer', None),
+    ('Python Developer', None),
+])
+def test_seniority_from_title(title, level):
+    assert extract_seniority(title) == level
+
+def test_seniority_falls_back_to_years_of_experience():
+    assert extract_seniority('I/O Engineer', 'You have 6+ years of experience with storage.') == 'senior'
+    assert extract_seniority('Python Developer', 'At least 1 year of professional experience.') == 'junior'
+
+def test_skills_and_salary():
+    assert extract_skills('Python, Django and AWS; Kubernetes is a plus') == ['AWS', 'Django', 'Kubernetes', 'Python']
+    assert extract_salary('$120,000 - $150,000 a year') == (120000, 150000)
+
+@pytest.mark.parametrize('text, skills', [
+    ('Experience with React and Rails', ['React', 'Ruby on Rails']),
+    ('You react quickly to incidents', []),
+    ('Keep the project on the rails', []),
+    ('Built with reactjs', ['React']),
+])
+def test_skills_that_are_also_english_words(text, skills):
+    assert extract_skills(text) == skills
+
+@pytest.mark.parametrize('text, salary', [
+    ('$45 to $55 per hour', (93600, 114400)),
+    ('Pays $40 hourly', (83200, 83200)),
+    ('Salary: $90,000 - $110,000', (90000, 110000)),
+    ('$120K-$140K base, plus equity', (120000, 140000)),
+])
+def test_salary(text, salary):
+    assert extract_salary(text) == salary
+
+@pytest.mark.parametrize('text', [
+    'A $100 wellness stipend every month of the year is not a salary',
+    'Includes a $100 wellness stipend',
+    'We raised $25 in seed funding',
+    'Donate $50,000 to charity each quarter',
+    'We closed $20,000 in deals last week',
+])
+def test_amounts_that_are_not_salaries(text):
+    assert extract_salary(text) == (None, None)
@@ -0,0 +1,66 @@
+import json
+import re
+
+from conftest import StubModel
+from services.cache import ResultCache
+from services.gemini_service import GeminiService
+
+def _service(db_path, reply):
+    service = GeminiService(cache=ResultCache(path=db_path))
+    service.model = StubModel(reply)
+    return service
+
+def _jobs_in(prompt):
+    # Descriptions of a batch prompt, by their job number
+    return dict((int(number), text) for number, text in re.findall(r"### Job (\d+)\n(\S+)", prompt))
+
+def _batch_reply(prompt):
+    return json.dumps([{'job': number, 'skills': [text]} for number, text in _jobs_in(prompt).items()])
+
+def _single_reply(prompt):
+    return json.dumps({'skills': [prompt.split('Job description:')[1].split()[0]]})
+
+def test_short_batch_reply_falls_back_per_missing_job(db_path):
+    def reply(prompt):
+        if '### Job' in prompt:
+            # Only the first job is answered
+            return json.dumps([{'job': 0, 'skills': ['alpha']}])
+        return _single_reply(prompt)
+
+    service = _service(db_path, reply)
+    results = service.analyze_jobs_batch(['alpha', 'beta'])
+    assert results == [{'analysis': {'skills': ['alpha']}}, {'analysis': {'skills': ['beta']}}]
+    assert len(service.model.prompts) == 2
+
+def test_malformed_batch_reply_falls_back_and_reports_bad_jobs(db_path):
+    def reply(prompt):
+        if '### Job' in prompt:
+            return 'Sorry, I cannot help with that.'
+        if 'beta' in prompt:
+            return 'not json either'
+        return _single_reply(prompt)
+
+    service = _service(db_path, reply)
+    results = service.analyze_jobs_batch(['alpha', 'beta'])
+    assert results[0] == {'analysis': {'skills': ['alpha']}}
+    assert set(results[1]) == {'error'}
+    # One batch call, then one call per job
+    assert len(service.model.prompts) == 3
+
+    # Only the job that got an analysis is cached
+    service.model.prompts.clear()
+    service.analyze_jobs_batch(['alpha', 'beta'])
+    assert [_jobs_in(prompt) for prompt in service.model.prompts if '### Job' in prompt] == [{0: 'beta'}]
+
+def test_only_uncached_jobs_are_sent(db_path):
+    service = _service(db_path, _batch_reply)
+    service.analyze_jobs_batch(['alpha'])
+
+    service.model.prompts.clear()
+    results = service.analyze_jobs_batch(['alpha', 'beta', 'alpha', 'beta'])
+    assert results == [
+        {'analysis': {'skills': ['alpha']}}, {'analysis': {'skills': ['beta']}},
+        {'analysis': {'skills': ['alpha']}}, {'analysis': {'skills': ['beta']}},
+    ]
+    assert len(service.model.prompts) == 1
+    assert _jobs_in(service.model.prompts[0]) == {0: 'beta'}
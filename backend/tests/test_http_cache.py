@@ -0,0 +1,69 @@
+from benchmarks.stub_server import load_fixture, start_stub_server
+from scrapers import engine, http_cache, parsing
+from scrapers.http_cache import PageCache
+from scrapers.sources import INDEED
+
+def test_revalidated_page_is_served_from_cache(db_path):
+    server, base_url = start_stub_server(load_fixture('indeed'), etag='"v1"')
+    try:
+        cache = PageCache(path=db_path)
+        url = f"{base_url}/jobs?q=python"
+
+        first = cache.fetch(url, ttl=0)
+        assert server.hits == {200: 1}
+        assert first.jobs is None
+        cards = parsing.parse_cards(first.text, INDEED.card)
+        jobs = engine.jobs_from_cards(INDEED, cards)
+        cache.remember_jobs(first, http_cache.cards_digest(cards), jobs)
+
+        # Stale at once (ttl=0), so the board is asked again and answers 304
+        second = cache.fetch(url, ttl=0)
+        assert server.hits == {200: 1, 304: 1}
+        assert second.text == first.text
+        assert second.jobs == jobs
+    finally:
+        server.shutdown()
+
+def test_cached_jobs_get_a_fresh_posting_date(db_path, monkeypatch):
+    server, base_url = start_stub_server(load_fixture('indeed'), etag='"v1"')
+    try:
+        cache = PageCache(path=db_path)
+        monkeypatch.setattr(http_cache, 'get_cache', lambda: cache)
+        monkeypatch.setattr(INDEED, 'base_url', base_url)
+        monkeypatch.setattr(INDEED, 'cache_ttl', 0)
+
+        monkeypatch.setattr(engine, '_today', lambda: '2024-01-01')
+        first = list(engine.scrape(INDEED, 'python', 'remote'))
+
+        monkeypatch.setattr(engine, '_today', lambda: '2024-01-02')
+        monkeypatch.setattr(parsing, 'parse_cards', None)  # a second parse would fail
+        second = list(engine.scrape(INDEED, 'python', 'remote'))
+
+        assert server.hits == {200: 1, 304: 1}
+        assert [job['date_posted'] for job in first] == ['2024-01-01'] * len(first)
+        assert [job['date_posted'] for job in second] == ['2024-01-02'] * len(first)
+        assert [job['url'] for job in second] == [job['url'] for job in first]
+    finally:
+        server.shutdown()
+
+def test_page_whose_chrome_changed_keeps_its_parsed_jobs(db_path, monkeypatch):
+    fixture = load_fixture('indeed')
+    requests = iter(range(1000))
+    # A per-request token outside the job cards, as boards embed for CSRF or tracking
+    server, base_url = start_stub_server(lambda: fixture.replace('</body>', f'<input name="csrf" value="{next(requests)}"></body>'))
+    try:
+        cache = PageCache(path=db_path)
+        monkeypatch.setattr(http_cache, 'get_cache', lambda: cache)
+        monkeypatch.setattr(INDEED, 'base_url', base_url)
+        monkeypatch.setattr(INDEED, 'cache_ttl', 0)
+
+        first = list(engine.scrape(INDEED, 'python', 'remote'))
+        parsed = []
+        monkeypatch.setattr(engine, 'jobs_from_cards', lambda spec, cards: parsed.append(spec) or [])
+        second = list(engine.scrape(INDEED, 'python', 'remote'))
+
+        assert server.hits == {200: 2}
+        assert parsed == []
+        assert second == first
+    finally:
+        server.shutdown()
@@ -0,0 +1,12 @@
+from scrapers import client
+from services import metrics
+
+def test_throttle_state_is_exported():
+    host = 'metrics-test.example.com'
+    client.throttle.record(host, None)
+    client.throttle.record(host, 503)
+
+    lines = metrics.render().splitlines()
+    assert '# TYPE scrape_host_failures gauge' in lines
+    assert f'scrape_host_failures{{host="{host}"}} 2' in lines
+    assert any(line.startswith(f'scrape_host_rate{{host="{host}"}} ') for line in lines)
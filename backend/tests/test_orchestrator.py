@@ -0,0 +1,35 @@
+import time
+
+from benchmarks.stub_server import load_fixture, start_stub_server
+from scrapers import engine, http_cache, orchestrator
+from scrapers.sources import INDEED, LINKEDIN
+
+def test_slow_source_times_out_and_fast_one_is_kept(monkeypatch):
+    fast, fast_url = start_stub_server(load_fixture('indeed'))
+    slow, slow_url = start_stub_server(load_fixture('linkedin'), delay=3)
+    try:
+        monkeypatch.setattr(http_cache, 'get_cache', lambda: None)
+        monkeypatch.setattr(INDEED, 'base_url', fast_url)
+        monkeypatch.setattr(LINKEDIN, 'base_url', slow_url)
+
+        started = time.perf_counter()
+        jobs, status = orchestrator.run_scrapers('python', 'remote', ['indeed', 'linkedin'], timeout=1)
+        elapsed = time.perf_counter() - started
+
+        # The deadline applies per source: the call returns without waiting out the slow board
+        assert elapsed < 2.5
+        assert status['indeed']['status'] == 'ok'
+        assert status['linkedin']['status'] == 'timeout'
+        assert status['linkedin']['count'] == 0
+        assert status['linkedin']['elapsed'] >= 1
+
+        expected = engine.parse_page(INDEED, load_fixture('indeed'))
+        assert status['indeed']['count'] == len(expected) > 0
+        assert [job['url'] for job in jobs] == [job['url'] for job in expected]
+    finally:
+        fast.shutdown()
+        slow.shutdown()
+
+def test_unknown_sources_are_skipped():
+    jobs, status = orchestrator.run_scrapers('python', 'remote', ['nowhere'], timeout=1)
+    assert jobs == [] and status == {}
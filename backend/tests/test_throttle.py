@@ -0,0 +1,76 @@
+import pytest
+
+from scrapers import throttle
+from scrapers.throttle import HostThrottle, HostUnavailable
+
+class FakeClock:
+    """Stands in for the time module: sleeping moves monotonic() forward instantly"""
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttle, 'time', clock)
+    return clock
+
+def test_retry_after_pauses_the_host(clock):
+    limiter = HostThrottle(rate=2, burst=5)
+    limiter.acquire('example.com')
+    limiter.record('example.com', 429, retry_after=10)
+    limiter.acquire('example.com')
+    assert clock.slept == [pytest.approx(10)]
+    # Other hosts are not held back
+    limiter.acquire('other.com')
+    assert len(clock.slept) == 1
+
+def test_slow_downs_halve_the_rate_and_successes_recover_it(clock):
+    limiter = HostThrottle(rate=2, min_rate=0.1, max_rate=10, threshold=100)
+    limiter.record('example.com', 503)
+    assert limiter.snapshot()['example.com']['rate'] == 1.0
+    limiter.record('example.com', 429, retry_after=0)
+    assert limiter.snapshot()['example.com']['rate'] == 0.5
+    for _ in range(5):
+        limiter.record('example.com', 200)
+    assert limiter.snapshot()['example.com']['rate'] == pytest.approx(1.0)
+    for _ in range(10):
+        limiter.record('example.com', 403, retry_after=0)
+    assert limiter.snapshot()['example.com']['rate'] == 0.1
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    limiter = HostThrottle(threshold=3, cooldown=60)
+    for _ in range(3):
+        limiter.record('example.com', None)
+    assert limiter.retry_in('example.com') == 60
+    with pytest.raises(HostUnavailable) as raised:
+        limiter.acquire('example.com')
+    assert raised.value.retry_in == 60
+
+    # Half-open after the cool-down: one request goes out, and one more failure opens it again
+    clock.now += 60
+    limiter.acquire('example.com')
+    limiter.record('example.com', 500)
+    assert limiter.retry_in('example.com') == 60
+
+    # A success while half-open closes it for good
+    clock.now += 60
+    limiter.acquire('example.com')
+    limiter.record('example.com', 200)
+    limiter.record('example.com', None)
+    limiter.record('example.com', None)
+    assert limiter.retry_in('example.com') == 0
+    limiter.acquire('example.com')
+
+def test_wait_beyond_max_wait_is_refused(clock):
+    limiter = HostThrottle(rate=2, max_wait=30)
+    limiter.record('example.com', 429, retry_after=120)
+    with pytest.raises(HostUnavailable):
+        limiter.acquire('example.com')
@@ -2,7 +2,9 @@
 import streamlit as st
 import requests
 import pandas as pd
+import datetime
 import json
+import time
 import plotly.express as px
 
 # Page configuration
@@ -15,6 +17,140 @@ st.set_page_config(
 # API endpoint
 API_URL = "http://localhost:5000/api"
 
+# How often and how long to poll the backend for queued AI tasks, in seconds
+TASK_POLL_INTERVAL = 1.0
+TASK_TIMEOUT = 180
+
+# Result page sizes on offer, and seconds a fetched page or analytics answer is reused
+PAGE_SIZES = [10, 25, 50]
+PAGE_CACHE_TTL = 60
+ANALYTICS_CACHE_TTL = 30
+
+@st.cache_resource
+def api_session():
+    """One pooled HTTP session to the backend, shared by every rerun and browser tab"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_data(ttl=PAGE_CACHE_TTL, show_spinner=False)
+def fetch_page(run_id, cursor, limit, collapse):
+    """One page of a scrape run's jobs, newest first"""
+    params = {"run_id": run_id, "limit": limit, "collapse_duplicates": int(collapse)}
+    if cursor:
+        params["cursor"] = cursor
+    response = api_session().get(f"{API_URL}/jobs", params=params)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=ANALYTICS_CACHE_TTL, show_spinner=False)
+def fetch_analytics(params):
+    response = api_session().get(f"{API_URL}/analytics", params=params)
+    response.raise_for_status()
+    return response.json()
+
+def wait_for_task(response):
+    """Poll a task queued by the backend until it finishes; returns its result or None on failure"""
+    if response.status_code != 202:
+        return None
+    task_id = response.json()["task_id"]
+    deadline = time.time() + TASK_TIMEOUT
+    while time.time() < deadline:
+        task = api_session().get(f"{API_URL}/tasks/{task_id}").json()
+        if task["status"] == "done":
+            return task["result"]
+        if task["status"] == "error":
+            return None
+        time.sleep(TASK_POLL_INTERVAL)
+    return None
+
+def stream_events(method, path, **kwargs):
+    """Yield the NDJSON events of a streaming backend endpoint as they arrive"""
+    with api_session().request(method, f"{API_URL}/{path}", stream=True, **kwargs) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+
+def stream_text(method, path, placeholder, **kwargs):
+    """Render streamed LLM text into `placeholder` as it arrives; returns the text, or None on failure"""
+    text = ""
+    for event in stream_events(method, path, **kwargs):
+        if event["type"] == "chunk":
+            text += event["text"]
+            placeholder.markdown(text)
+        elif event["type"] == "error":
+            return None
+    return text
+
+def show_ai_result(kind, job_id):
+    """Show a job's analysis or summary, asking the backend only the first time this session; False on failure"""
+    results = st.session_state.setdefault("ai_results", {})
+    placeholder = st.empty()
+    if (kind, job_id) in results:
+        placeholder.markdown(results[(kind, job_id)])
+        return True
+    text = stream_text("POST", f"{kind}/stream", placeholder, json={"job_id": job_id})
+    if text is None:
+        return False
+    results[(kind, job_id)] = text
+    return True
+
+# A fragment, so the AI buttons rerun this one card rather than the whole page
+@st.fragment
+def render_job(job):
+    with st.expander(f"{job['title']} at {job['company']}"):
+        cols = st.columns([3, 1])
+        with cols[0]:
+            st.markdown(f"**Company:** {job['company']}")
+            st.markdown(f"**Location:** {job['location']}")
+            st.markdown(f"**Description:** {job['description']}")
+            st.markdown(f"**Date Posted:** {job['date_posted']}")
+        with cols[1]:
+            st.markdown(f"**Source:** {job['source']}")
+            st.link_button("View Job", job['url'])
+            
+            # AI analysis buttons; results already generated stay on the card
+            results = st.session_state.get("ai_results", {})
+            if st.button("✨ AI Analysis", key=f"analyze_{job['id']}") or ("analyze", job['id']) in results:
+                if not show_ai_result("analyze", job['id']):
+                    st.error("Failed to analyze job")
+            
+            if st.button("📝 Quick Summary", key=f"summary_{job['id']}") or ("summarize", job['id']) in results:
+                if not show_ai_result("summarize", job['id']):
+                    st.error("Failed to summarize job")
+
+def reset_pages():
+    st.session_state.cursors = [None]
+
+def render_results():
+    """The current page of the last search's results, fetched from the backend a page at a time"""
+    controls = st.columns([1, 1, 2, 1, 1])
+    with controls[0]:
+        page_size = st.selectbox("Per page", PAGE_SIZES, key="page_size", on_change=reset_pages)
+    with controls[1]:
+        collapse = st.checkbox("Merge duplicates", key="collapse_results", on_change=reset_pages)
+    
+    # Cursors of the pages visited so far; the last one is the page on screen
+    cursors = st.session_state.cursors
+    try:
+        page = fetch_page(st.session_state.run_id, cursors[-1], page_size, collapse)
+    except Exception as e:
+        st.error(f"Error connecting to backend: {e}")
+        return
+    
+    with controls[2]:
+        st.markdown(f"Page {len(cursors)} · {st.session_state.result_count} jobs found")
+    with controls[3]:
+        st.button("Previous", on_click=cursors.pop, disabled=len(cursors) == 1)
+    with controls[4]:
+        st.button("Next", on_click=cursors.append, args=(page["next_cursor"],), disabled=page["next_cursor"] is None)
+    
+    for job in page["jobs"]:
+        render_job(job)
+
 def main():
     st.title("🔍 Job Listings Scraper with AI Insights")
     
@@ -40,6 +176,10 @@ def main():
         if glassdoor:
             sources.append("glassdoor")
         
+        # Saved searches are re-crawled in the background and answered from the database
+        keep_fresh = st.checkbox("Keep this search fresh", value=False)
+        refresh = st.checkbox("Force a live scrape", value=False)
+        
         # AI Features section
         st.subheader("AI Assistant")
         st.write("Share your profile for personalized recommendations:")
@@ -58,67 +198,42 @@ def main():
     # Search Results Tab
     with tabs[0]:
         if search_button:
-            with st.spinner("Scraping job listings..."):
-                # Make API request to Flask backend
-                payload = {
-                    "job_title": job_title,
-                    "location": location,
-                    "sources": sources
-                }
-                
-                try:
-                    response = requests.post(f"{API_URL}/scrape", json=payload)
-                    if response.status_code == 200:
-                        data = response.json()
-                        jobs = data.get("jobs", [])
-                        
-                        # Store jobs in session state for analytics
-                        st.session_state.jobs = jobs
-                        
+            # Make API request to Flask backend
+            payload = {
+                "job_title": job_title,
+                "location": location,
+                "sources": sources,
+                "save": keep_fresh,
+                "refresh": refresh,
+                # Only counts stream back; the jobs themselves are paged in below
+                "include_jobs": False
+            }
+            
+            status = st.empty()
+            status.info("Scraping job listings...")
+            found = 0
+            
+            try:
+                for event in stream_events("POST", "scrape/stream", json=payload):
+                    if event["type"] == "jobs":
+                        found += event["count"]
+                        status.info(f"Found {found} job listings so far...")
+                    elif event["type"] == "done":
                         # Display job count
-                        st.success(f"Found {len(jobs)} job listings")
+                        status.success(f"Found {event['count']} job listings")
+                        for source, outcome in event.get("sources", {}).items():
+                            if outcome["status"] == "degraded":
+                                st.warning(f"{source} is rate limiting us; retrying in {outcome.get('retry_in', 0):.0f}s")
                         
-                        # Display jobs in cards
-                        for job in jobs:
-                            with st.expander(f"{job['title']} at {job['company']}"):
-                                cols = st.columns([3, 1])
-                                with cols[0]:
-                                    st.markdown(f"**Company:** {job['company']}")
-                                    st.markdown(f"**Location:** {job['location']}")
-                                    st.markdown(f"**Description:** {job['description']}")
-                                    st.markdown(f"**Date Posted:** {job['date_posted']}")
-                                with cols[1]:
-                                    st.markdown(f"**Source:** {job['source']}")
-                                    st.link_button("View Job", job['url'])
-                                    
-                                    # AI analysis buttons
-                                    if st.button("✨ AI Analysis", key=f"analyze_{job['id']}"):
-                                        with st.spinner("Analyzing job..."):
-                                            analysis_response = requests.post(
-                                                f"{API_URL}/analyze", 
-                                                json={"job_id": job['id']}
-                                            )
-                                            if analysis_response.status_code == 200:
-                                                analysis_data = analysis_response.json()
-                                                st.json(analysis_data["analysis"])
-                                            else:
-                                                st.error("Failed to analyze job")
-                                    
-                                    if st.button("📝 Quick Summary", key=f"summary_{job['id']}"):
-                                        with st.spinner("Generating summary..."):
-                                            summary_response = requests.post(
-                                                f"{API_URL}/summarize", 
-                                                json={"job_id": job['id']}
-                                            )
-                                            if summary_response.status_code == 200:
-                                                summary_data = summary_response.json()
-                                                st.write(summary_data["summary"])
-                                            else:
-                                                st.error("Failed to summarize job")
-                    else:
-                        st.error(f"Error: {response.status_code} - {response.text}")
-                except Exception as e:
-                    st.error(f"Error connecting to backend: {e}")
+                        # Kept in session state so the results survive reruns from any other widget
+                        st.session_state.run_id = event["run_id"]
+                        st.session_state.result_count = event["count"]
+                        reset_pages()
+            except Exception as e:
+                status.error(f"Error connecting to backend: {e}")
+        
+        if st.session_state.get("run_id") is not None:
+            render_results()
     
     # AI Insights Tab
     with tabs[1]:
@@ -130,12 +245,8 @@ def main():
             if st.button("Generate Market Insights"):
                 with st.spinner("Analyzing job market data..."):
                     try:
-                        insights_response = requests.get(f"{API_URL}/insights")
-                        if insights_response.status_code == 200:
-                            insights_data = insights_response.json()
-                            st.markdown("### Job Market Trends")
-                            st.write(insights_data["insights"])
-                        else:
+                        st.markdown("### Job Market Trends")
+                        if stream_text("GET", "insights/stream", st.empty()) is None:
                             st.error("Failed to generate insights")
                     except Exception as e:
                         st.error(f"Error connecting to backend: {e}")
@@ -149,13 +260,13 @@ def main():
                             "experience": user_experience
                         }
                         
-                        recommendations_response = requests.post(
+                        recommendations_response = api_session().post(
                             f"{API_URL}/recommend", 
                             json=payload
                         )
                         
-                        if recommendations_response.status_code == 200:
-                            recommendations_data = recommendations_response.json()
+                        recommendations_data = wait_for_task(recommendations_response)
+                        if recommendations_data is not None:
                             st.markdown("### Recommended Jobs for You")
                             
                             # Display each recommendation
@@ -173,27 +284,47 @@ def main():
     
     # Analytics Tab
     with tabs[2]:
-        if 'jobs' in st.session_state and st.session_state.jobs:
-            jobs = st.session_state.jobs
-            
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(jobs)
-            
+        # The backend aggregates the counts, so only a few dozen rows come over whatever the database size
+        filter_cols = st.columns([2, 2, 1])
+        with filter_cols[0]:
+            analytics_query = st.text_input("Filter by keywords", "", key="analytics_query")
+        with filter_cols[1]:
+            limit_dates = st.checkbox("Limit to a date range", value=False)
+            today = datetime.date.today()
+            date_range = st.date_input(
+                "Posted between", value=(today - datetime.timedelta(days=30), today), disabled=not limit_dates
+            )
+        with filter_cols[2]:
+            collapse = st.checkbox("Merge cross-board duplicates", value=False)
+        
+        params = {"top": 15, "collapse_duplicates": int(collapse)}
+        if analytics_query:
+            params["q"] = analytics_query
+        if limit_dates and len(date_range) == 2:
+            params["date_from"], params["date_to"] = (day.isoformat() for day in date_range)
+        
+        analytics = None
+        try:
+            analytics = fetch_analytics(params)
+        except Exception as e:
+            st.error(f"Error connecting to backend: {e}")
+        
+        if analytics and analytics["total"]:
             # Display basic stats
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Total Jobs", len(df))
+                st.metric("Total Jobs", analytics["total"])
             with col2:
-                st.metric("Companies", df['company'].nunique())
+                st.metric("Companies", analytics["company_count"])
             with col3:
-                st.metric("Locations", df['location'].nunique())
+                st.metric("Locations", analytics["location_count"])
             
             # Charts row
             chart_col1, chart_col2 = st.columns(2)
             
             with chart_col1:
                 # Source distribution
-                source_counts = df['source'].value_counts().reset_index()
+                source_counts = pd.DataFrame(analytics["by_source"], columns=['name', 'count'])
                 source_counts.columns = ['Source', 'Count']
                 
                 fig1 = px.pie(
@@ -206,7 +337,7 @@ def main():
             
             with chart_col2:
                 # Location distribution
-                location_counts = df['location'].value_counts().reset_index().head(10)
+                location_counts = pd.DataFrame(analytics["by_location"][:10], columns=['name', 'count'])
                 location_counts.columns = ['Location', 'Count']
                 
                 fig2 = px.bar(
@@ -218,7 +349,7 @@ def main():
                 st.plotly_chart(fig2, use_container_width=True)
             
             # Company distribution
-            company_counts = df['company'].value_counts().reset_index().head(15)
+            company_counts = pd.DataFrame(analytics["by_company"], columns=['name', 'count'])
             company_counts.columns = ['Company', 'Count']
             
             fig3 = px.bar(
@@ -229,10 +360,18 @@ def main():
             )
             st.plotly_chart(fig3, use_container_width=True)
             
-            # Raw data table
-            st.subheader("Raw Data")
-            st.dataframe(df)
-        else:
+            # Skills extracted from the descriptions when the jobs were stored
+            skill_counts = pd.DataFrame(analytics["by_skill"], columns=['name', 'count'])
+            skill_counts.columns = ['Skill', 'Count']
+            
+            fig4 = px.bar(
+                skill_counts,
+                x='Skill',
+                y='Count',
+                title='Most Requested Skills'
+            )
+            st.plotly_chart(fig4, use_container_width=True)
+        elif analytics is not None:
             st.info("No data available yet. Please run a search first.")
     
     